@@ -5,9 +5,11 @@ import matplotlib.pyplot as plt
 # Library import
 from odesolver.utils import create_dir
 from odesolver.solver import ODESim
+from odesolver.reference import reference
 
 # Local
 from rhssquare import RHSSquare
+from pendulum import Pendulum
 
 class ConvergenceODE:
     def __init__(self, tmin, tend, list_nts, schemes, model, init_value, fig_dir):
@@ -17,7 +19,9 @@ class ConvergenceODE:
         self.times = [np.linspace(tmin, tend, ntimes) for ntimes in list_nts]
         self.sims = [ODESim(times, schemes, model, init_value) for times in self.times]
         self.model = model
+        self.init_value = init_value
         self.schemes = schemes
+        self.reference = None
         self.linestyles = ['k-.', 'k--', 'k:']
         self.fig_dir = f'figures/{fig_dir}/'
         create_dir(self.fig_dir)
@@ -26,11 +30,36 @@ class ConvergenceODE:
         for sim in self.sims:
             sim.run_schemes()
     
+    def u_exact(self, times):
+        """ Exact solution of the model if known, cached reference solution otherwise """
+        if hasattr(self.model, 'u_exact'):
+            return self.model.u_exact(times)
+        if self.reference is None:
+            self.reference = reference(self.model, self.tmin, self.tend, self.init_value)
+        return self.reference(times)
+
+    def errors(self):
+        """ Maximum error of each scheme for each number of time steps """
+        errors = np.zeros((len(self.schemes), len(self.sims)))
+        for i_sim, sim in enumerate(self.sims):
+            u_exact = np.reshape(self.u_exact(sim.times), (sim.ntimes, -1))
+            errors[:, i_sim] = np.max(np.abs(sim.v - u_exact), axis=(1, 2))
+        return errors
+
+    def report(self):
+        """ Print the errors and the observed orders of convergence """
+        errors = self.errors()
+        dts = (self.tend - self.tmin) / (np.array(self.list_nts) - 1)
+        for i_scheme, scheme in enumerate(self.schemes):
+            orders = np.log(errors[i_scheme, :-1] / errors[i_scheme, 1:]) / np.log(dts[:-1] / dts[1:])
+            print(f'{scheme:>14s} - errors = ' + ' '.join(f'{e:.2e}' for e in errors[i_scheme])
+                    + ' - orders = ' + ' '.join(f'{o:.2f}' for o in orders))
+
     def plot_errors(self):
         for i_scheme, scheme in enumerate(self.schemes):
             fig, axes = plt.subplots(nrows=2, sharex=True, figsize=(8, 8))
             for i_sim, sim in enumerate(self.sims):
-                u_exact = self.model.u_exact(sim.times)
+                u_exact = self.u_exact(sim.times)
                 self.model.ax_plot(axes, sim.times, sim.v[i_scheme, :], u_exact, self.linestyles[i_sim])
             axes[0].plot(sim.times, u_exact, 'k')
             axes[0].legend([rf'$\Delta x$ = {(self.tend - self.tmin) / (nts - 1):.1e}' for nts in self.list_nts] + ['Exact'])
@@ -44,4 +73,12 @@ if __name__ == '__main__':
     list_nts = [101, 201, 401]
     cvg_sim = ConvergenceODE(tmin, tend, list_nts, ['forwardEuler', 'midpoint', 'multi_step2'], RHSSquare(), 1.0, 'cvg/')
     cvg_sim.run_convergence()
-    cvg_sim.plot_errors()
\ No newline at end of file
+    cvg_sim.plot_errors()
+    cvg_sim.report()
+
+    # Convergence test for the pendulum against its cached reference solution
+    list_nts = [1001, 2001, 4001]
+    cvg_sim = ConvergenceODE(tmin, tend, list_nts, ['forwardEuler', 'midpoint', 'ros2', 'rodas3'],
+                    Pendulum(1, 9.81), np.array([0.0, 45 * np.pi / 180]), 'cvg_pendulum/')
+    cvg_sim.run_convergence()
+    cvg_sim.report()
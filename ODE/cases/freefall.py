@@ -1,6 +1,8 @@
+import argparse
 import numpy as np
 import matplotlib.pyplot as plt
 from odesolver.solver import ODESim
+from odesolver.render import Renderer
 
 class FreeFall:
     """ Class of evaluation of FreeFall problem """
@@ -54,10 +56,15 @@ class FreeFall:
         fig.savefig(figname, bbox_inches='tight')
 
 if __name__ == '__main__':
-    # Free falling ice sphere
-    tmin, tend, ntimes = 0, 25, 101
-    times = np.linspace(tmin, tend, ntimes)
-    model = FreeFall(0.01, 917, 0.9, 1.69e-5, 9.81)
-    sim = ODESim(times, ['forwardEuler', 'midpoint', 'multi_step2'], model, 0.0, fig_dir='free_fall/')
-    sim.run_schemes()
-    sim.plot()
\ No newline at end of file
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--no-plot', action='store_true', help='Only write the result bundles')
+    args = parser.parse_args()
+
+    with Renderer(plot=not args.no_plot) as renderer:
+        # Free falling ice sphere
+        tmin, tend, ntimes = 0, 25, 101
+        times = np.linspace(tmin, tend, ntimes)
+        model = FreeFall(0.01, 917, 0.9, 1.69e-5, 9.81)
+        sim = ODESim(times, ['forwardEuler', 'midpoint', 'multi_step2'], model, 0.0, fig_dir='free_fall/')
+        sim.run_schemes()
+        sim.plot(renderer=renderer)
\ No newline at end of file
@@ -0,0 +1,34 @@
+import argparse
+import numpy as np
+from odesolver.parareal import PararealSim
+from odesolver.render import Renderer
+
+from pendulum import Pendulum
+from freefall import FreeFall
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--nslices', type=int, default=8, help='Number of time slices')
+    parser.add_argument('-w', '--workers', type=int, default=None, help='Number of processes')
+    parser.add_argument('--no-plot', action='store_true', help='Only write the result bundles')
+    args = parser.parse_args()
+
+    with Renderer(plot=not args.no_plot) as renderer:
+        # Long horizon pendulum
+        tmin, tend, ntimes = 0, 100, 20001
+        times = np.linspace(tmin, tend, ntimes)
+        sim = PararealSim(times, 'rodas3', 'rodas3', Pendulum(1, 9.81),
+            np.array([0.0, 45 * np.pi / 180]), args.nslices, coarse_ratio=10,
+            tol=1e-6, nworkers=args.workers, fig_dir='parareal/')
+        sim.run_schemes()
+        sim.report()
+        sim.plot('pendulum', renderer=renderer)
+
+        # Free falling ice sphere
+        tmin, tend, ntimes = 0, 25, 20001
+        times = np.linspace(tmin, tend, ntimes)
+        sim = PararealSim(times, 'forwardEuler', 'forwardEuler', FreeFall(0.01, 917, 0.9, 1.69e-5, 9.81),
+            0.0, args.nslices, coarse_ratio=50, tol=1e-8, nworkers=args.workers, fig_dir='parareal/')
+        sim.run_schemes()
+        sim.report()
+        sim.plot('free_fall', renderer=renderer)
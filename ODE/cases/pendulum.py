@@ -1,6 +1,8 @@
+import argparse
 import numpy as np
 import matplotlib.pyplot as plt
 from odesolver.solver import ODESim
+from odesolver.render import Renderer
 
 class Pendulum:
     def __init__(self, L, g):
@@ -26,10 +28,15 @@ class Pendulum:
         fig.savefig(figname, bbox_inches='tight')
 
 if __name__ == '__main__':
-    # Pendulum system model
-    tmin, tend, ntimes = 0, 10, 501
-    times = np.linspace(tmin, tend, ntimes)
-    sim = ODESim(times, ['forwardEuler', 'midpoint'], Pendulum(1, 9.81), 
-        np.array([0.0, 45 * np.pi / 180]), fig_dir='pendulum/')
-    sim.run_schemes()
-    sim.plot()
\ No newline at end of file
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--no-plot', action='store_true', help='Only write the result bundles')
+    args = parser.parse_args()
+
+    with Renderer(plot=not args.no_plot) as renderer:
+        # Pendulum system model
+        tmin, tend, ntimes = 0, 10, 501
+        times = np.linspace(tmin, tend, ntimes)
+        sim = ODESim(times, ['forwardEuler', 'midpoint'], Pendulum(1, 9.81), 
+            np.array([0.0, 45 * np.pi / 180]), fig_dir='pendulum/')
+        sim.run_schemes()
+        sim.plot(renderer=renderer)
\ No newline at end of file
@@ -1,6 +1,8 @@
+import argparse
 import numpy as np
 import matplotlib.pyplot as plt
 from odesolver.solver import ODESim
+from odesolver.render import Renderer
 
 class RHSSquare:
     def __init__(self):
@@ -29,9 +31,14 @@ class RHSSquare:
         fig.savefig(figname, bbox_inches='tight')
 
 if __name__ == '__main__':
-    # Second test with other model
-    tmin, tend, ntimes = 0, 10, 101
-    times = np.linspace(tmin, tend, ntimes)
-    sim = ODESim(times, ['forwardEuler', 'midpoint', 'multi_step2'], RHSSquare(), 1.0, fig_dir='rhs_square/')
-    sim.run_schemes()
-    sim.plot()
\ No newline at end of file
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--no-plot', action='store_true', help='Only write the result bundles')
+    args = parser.parse_args()
+
+    with Renderer(plot=not args.no_plot) as renderer:
+        # Second test with other model
+        tmin, tend, ntimes = 0, 10, 101
+        times = np.linspace(tmin, tend, ntimes)
+        sim = ODESim(times, ['forwardEuler', 'midpoint', 'multi_step2'], RHSSquare(), 1.0, fig_dir='rhs_square/')
+        sim.run_schemes()
+        sim.plot(renderer=renderer)
\ No newline at end of file
@@ -0,0 +1,74 @@
+import os
+import argparse
+import numpy as np
+import matplotlib.pyplot as plt
+from odesolver.rosenbrock import METHODS, integrate
+
+class Robertson:
+    """ Robertson chemical kinetics, the canonical stiff problem of CVODE """
+    def __init__(self, k1=0.04, k2=3.0e7, k3=1.0e4):
+        self.k1 = k1
+        self.k2 = k2
+        self.k3 = k3
+
+        # Dimension of the system
+        self.nd = 3
+
+    def f(self, u, t):
+        r1, r2, r3 = self.k1 * u[0], self.k2 * u[1]**2, self.k3 * u[1] * u[2]
+        return np.array([- r1 + r3, r1 - r2 - r3, r2])
+
+    def jac_f(self, u, t):
+        return np.array([
+            [- self.k1, self.k3 * u[2], self.k3 * u[1]],
+            [self.k1, - 2 * self.k2 * u[1] - self.k3 * u[2], - self.k3 * u[1]],
+            [0, 2 * self.k2 * u[1], 0]
+        ])
+
+    def df_dt(self, u, t):
+        return np.zeros(self.nd)
+
+    def plot(self, time, u, figtitle, figname, data=None):
+        fig, ax = plt.subplots()
+        for i in range(self.nd):
+            ax.plot(time, u[:, i], label=f'$y_{i + 1:d}$')
+            if data is not None:
+                ax.plot(data[:, 0], data[:, i + 1], 'k+')
+        ax.set_xscale('log')
+        ax.set_yscale('log')
+        ax.set_xlabel('$t$ [s]')
+        ax.legend()
+        ax.grid(True)
+        fig.suptitle(figtitle)
+        fig.savefig(figname, bbox_inches='tight')
+        plt.close(fig)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-m', '--methods', nargs='+', default=list(METHODS), choices=list(METHODS))
+    parser.add_argument('--rtol', type=float, default=1e-4)
+    parser.add_argument('--no-plot', action='store_true')
+    args = parser.parse_args()
+
+    # Reference solution of CVODE
+    data = np.loadtxt(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+        '../libraries/sundials/data/cvRobert_dns.dat'), skiprows=1)
+    data = data[np.argsort(data[:, 0])]
+    # Tolerances of the CVODE example, the data being only accurate up to them
+    rtol_cvode, atol = 1e-4, np.array([1e-8, 1e-14, 1e-6])
+
+    model = Robertson()
+    fig_dir = 'figures/robertson/'
+    os.makedirs(fig_dir, exist_ok=True)
+    for name in args.methods:
+        times, v, stats = integrate(model, 0.0, 4.0e10, np.array([1.0, 0.0, 0.0]),
+            METHODS[name], rtol=args.rtol, atol=atol, dt0=1e-6)
+        # Outputs at the CVODE times
+        _, v_data, _ = integrate(model, 0.0, 4.0e10, np.array([1.0, 0.0, 0.0]),
+            METHODS[name], rtol=args.rtol, atol=atol, dt0=1e-6, t_eval=data[:, 0])
+        # Differences in units of the CVODE error weights
+        diff = np.max(np.abs(v_data[1:] - data[:, 1:]) / (rtol_cvode * np.abs(data[:, 1:]) + atol), axis=0)
+        print(f"{name:>7s} - {stats['accepted']:d} steps ({stats['rejected']:d} rejected) - "
+                f"max weighted difference with CVODE: " + ' '.join(f'{d:.1e}' for d in diff))
+        if not args.no_plot:
+            model.plot(times[1:], v[1:], f'Robertson - {name}', fig_dir + name, data)
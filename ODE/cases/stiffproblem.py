@@ -1,7 +1,10 @@
+import argparse
 import numpy as np
 import matplotlib.pyplot as plt
 from odesolver.solver import ODESim
+from odesolver.render import Renderer
 from odesolver.utils import make_times
+from odesolver.reference import reference
 
 class StiffProblem:
     def __init__(self, lambda_1, lambda_2):
@@ -12,6 +15,18 @@ class StiffProblem:
     def f(self, u, t):
         return - self.lambda_1 * u + self.lambda_1 / 10 * np.sin(self.lambda_2 * t)
     
+    def jac_f(self, u, t):
+        return np.array([[- self.lambda_1]])
+
+    def f_stiff(self, u, t):
+        return - self.lambda_1 * u
+
+    def jac_stiff(self, u, t):
+        return np.array([[- self.lambda_1]])
+
+    def f_nonstiff(self, u, t):
+        return self.lambda_1 / 10 * np.sin(self.lambda_2 * t)
+
     def fbackwardEuler(self, u, t, dt):
         """ Hardcode backward Euler for this problem """
         return (u + self.lambda_1 * dt / 10 * np.sin(self.lambda_2 * (t + dt))) \
@@ -25,21 +40,49 @@ class StiffProblem:
         fig.savefig(figname, bbox_inches='tight')
 
 if __name__ == '__main__':
-    model = StiffProblem(1000, 1)
-    tmin, tend = 0, 5
-
-    # Explicit solver
-    dts = [1.0e-3, 1.9e-3, 2.0e-3, 2.1e-3]
-    for i, dt in enumerate(dts):
-        times = make_times(tmin, tend, dt)
-        sim = ODESim(times, ['forwardEuler'], model, 1.0, fig_dir=f'stiffproblem/FE/')
-        sim.run_schemes()
-        sim.plot(f'case_{i:d}')
-
-    # Implicit methods
-    dts = [5e-4, 5e-3, 5e-2, 5e-1]
-    for i, dt in enumerate(dts):
-        times = make_times(tmin, tend, dt)
-        sim = ODESim(times, ['backwardEuler'], model, 1.0, fig_dir=f'stiffproblem/BE/')
-        sim.run_schemes()
-        sim.plot(f'case_{i:d}')
\ No newline at end of file
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--no-plot', action='store_true', help='Only write the result bundles')
+    args = parser.parse_args()
+
+    with Renderer(plot=not args.no_plot) as renderer:
+        model = StiffProblem(1000, 1)
+        tmin, tend = 0, 5
+
+        # Explicit solver
+        dts = [1.0e-3, 1.9e-3, 2.0e-3, 2.1e-3]
+        for i, dt in enumerate(dts):
+            times = make_times(tmin, tend, dt)
+            sim = ODESim(times, ['forwardEuler'], model, 1.0, fig_dir=f'stiffproblem/FE/')
+            sim.run_schemes()
+            sim.plot(f'case_{i:d}', renderer=renderer)
+
+        # Implicit methods
+        dts = [5e-4, 5e-3, 5e-2, 5e-1]
+        for i, dt in enumerate(dts):
+            times = make_times(tmin, tend, dt)
+            sim = ODESim(times, ['backwardEuler'], model, 1.0, fig_dir=f'stiffproblem/BE/')
+            sim.run_schemes()
+            sim.plot(f'case_{i:d}', renderer=renderer)
+
+        # Rosenbrock methods
+        for i, dt in enumerate(dts):
+            times = make_times(tmin, tend, dt)
+            sim = ODESim(times, ['ros2', 'ros3p', 'rodas3'], model, 1.0, fig_dir=f'stiffproblem/ROS/')
+            sim.run_schemes()
+            sim.plot(f'case_{i:d}', renderer=renderer)
+
+        # IMEX methods: only the linear decay is implicit, the forcing being
+        # explicit while of the order of lambda_1
+        ref = reference(model, tmin, tend + max(dts), 1.0)
+        schemes = ['imexEuler', 'imexSSP2', 'ark3', 'ark4']
+        print('Max error of the IMEX methods against the reference solution '
+                f'after the initial layer (t > {10 / model.lambda_1:.0e})')
+        print(f"{'dt':>8s} " + ' '.join(f'{scheme:>10s}' for scheme in schemes))
+        for i, dt in enumerate(dts):
+            times = make_times(tmin, tend, dt)
+            sim = ODESim(times, schemes, model, 1.0, fig_dir=f'stiffproblem/IMEX/')
+            sim.run_schemes()
+            after = times > 10 / model.lambda_1
+            errors = np.max(np.abs(sim.v[:, after] - ref(times[after])), axis=(1, 2))
+            print(f'{dt:8.1e} ' + ' '.join(f'{error:10.2e}' for error in errors))
+            sim.plot(f'case_{i:d}', renderer=renderer)
@@ -0,0 +1,100 @@
+import numpy as np
+from scipy.linalg import lu_factor, lu_solve
+from .utils import jacobian_stiff
+
+class ImexMethod:
+    """ Additive Runge-Kutta method for v' = f_nonstiff(v, t) + f_stiff(v, t):
+    the non-stiff part is integrated by the explicit tableau (a_exp, b_exp, c_exp)
+    and the stiff part by the diagonally implicit tableau (a_imp, b_imp, c_imp) """
+    def __init__(self, name, a_exp, b_exp, c_exp, a_imp, b_imp, c_imp, order):
+        self.name = name
+        self.a_exp = np.array(a_exp, dtype=float)
+        self.b_exp = np.array(b_exp, dtype=float)
+        self.c_exp = np.array(c_exp, dtype=float)
+        self.a_imp = np.array(a_imp, dtype=float)
+        self.b_imp = np.array(b_imp, dtype=float)
+        self.c_imp = np.array(c_imp, dtype=float)
+        self.nstages = len(self.b_exp)
+        self.order = order
+
+# Forward-backward Euler
+IMEX_EULER = ImexMethod('imexEuler',
+    a_exp=[[0, 0], [1, 0]], b_exp=[1, 0], c_exp=[0, 1],
+    a_imp=[[0, 0], [0, 1]], b_imp=[0, 1], c_imp=[0, 1], order=1)
+
+# IMEX-SSP2(2,2,2) of Pareschi and Russo (2005): L-stable implicit part
+_g = 1 - 1 / np.sqrt(2)
+IMEX_SSP2 = ImexMethod('imexSSP2',
+    a_exp=[[0, 0], [1, 0]], b_exp=[0.5, 0.5], c_exp=[0, 1],
+    a_imp=[[_g, 0], [1 - 2 * _g, _g]], b_imp=[0.5, 0.5], c_imp=[_g, 1 - _g], order=2)
+
+# ARK3(2)4L[2]SA of Kennedy and Carpenter (2003): L-stable, stiffly accurate
+_g = 1767732205903 / 4055673282236
+_b = [1471266399579 / 7840856788654, - 4482444167858 / 7529755066697,
+        11266239266428 / 11593286722821, _g]
+_c = [0, 2 * _g, 3 / 5, 1]
+ARK3 = ImexMethod('ark3',
+    a_exp=[[0, 0, 0, 0],
+        [2 * _g, 0, 0, 0],
+        [5535828885825 / 10492691773637, 788022342437 / 10882634858940, 0, 0],
+        [6485989280629 / 16251701735622, - 4246266847089 / 9704473918619,
+            10755448449292 / 10357097424841, 0]],
+    b_exp=_b, c_exp=_c,
+    a_imp=[[0, 0, 0, 0],
+        [_g, _g, 0, 0],
+        [2746238789719 / 10658868560708, - 640167445237 / 6845629431997, _g, 0],
+        _b],
+    b_imp=_b, c_imp=_c, order=3)
+
+# ARK4(3)6L[2]SA of Kennedy and Carpenter (2003): L-stable, stiffly accurate
+_b = [82889 / 524892, 0, 15625 / 83664, 69875 / 102672, - 2260 / 8211, 1 / 4]
+_c = [0, 1 / 2, 83 / 250, 31 / 50, 17 / 20, 1]
+ARK4 = ImexMethod('ark4',
+    a_exp=[[0, 0, 0, 0, 0, 0],
+        [1 / 2, 0, 0, 0, 0, 0],
+        [13861 / 62500, 6889 / 62500, 0, 0, 0, 0],
+        [- 116923316275 / 2393684061468, - 2731218467317 / 15368042101831,
+            9408046702089 / 11113171139209, 0, 0, 0],
+        [- 451086348788 / 2902428689909, - 2682348792572 / 7519795681897,
+            12662868775082 / 11960479115383, 3355817975965 / 11060851509271, 0, 0],
+        [647845179188 / 3216320057751, 73281519250 / 8382639484533,
+            552539513391 / 3454668386233, 3354512671639 / 8306763924573, 4040 / 17871, 0]],
+    b_exp=_b, c_exp=_c,
+    a_imp=[[0, 0, 0, 0, 0, 0],
+        [1 / 4, 1 / 4, 0, 0, 0, 0],
+        [8611 / 62500, - 1743 / 31250, 1 / 4, 0, 0, 0],
+        [5012029 / 34652500, - 654441 / 2922500, 174375 / 388108, 1 / 4, 0, 0],
+        [15267082809 / 155376265600, - 71443401 / 120774400, 730878875 / 902184768,
+            2285395 / 8070912, 1 / 4, 0],
+        _b],
+    b_imp=_b, c_imp=_c, order=4)
+
+METHODS = {method.name: method for method in (IMEX_EULER, IMEX_SSP2, ARK3, ARK4)}
+
+def imex_step(method, model, v, t, dt, jac=None, tol=1e-10, max_iter=10):
+    """ One step of an IMEX method from v at t: only f_stiff is treated
+    implicitly, each implicit stage being solved by a simplified Newton method
+    with the stiff Jacobian jac frozen over the step (evaluated at v if None) """
+    v = np.atleast_1d(v)
+    if jac is None:
+        jac = jacobian_stiff(model, v, t)
+    F_exp = np.zeros((method.nstages, len(v)))
+    F_imp = np.zeros((method.nstages, len(v)))
+    lu, lu_diag = None, None
+    for i in range(method.nstages):
+        rhs = v + dt * (method.a_exp[i, :i] @ F_exp[:i] + method.a_imp[i, :i] @ F_imp[:i])
+        t_imp = t + method.c_imp[i] * dt
+        a_ii = method.a_imp[i, i]
+        k = rhs
+        if a_ii != 0:
+            # The diagonal coefficients are mostly equal, factorize once per value
+            if a_ii != lu_diag:
+                lu, lu_diag = lu_factor(np.eye(len(v)) - dt * a_ii * jac), a_ii
+            for _ in range(max_iter):
+                dk = lu_solve(lu, rhs + dt * a_ii * model.f_stiff(k, t_imp) - k)
+                k = k + dk
+                if np.max(np.abs(dk)) <= tol * (1 + np.max(np.abs(k))):
+                    break
+        F_exp[i] = model.f_nonstiff(k, t + method.c_exp[i] * dt)
+        F_imp[i] = model.f_stiff(k, t_imp)
+    return v + dt * (method.b_exp @ F_exp + method.b_imp @ F_imp)
@@ -0,0 +1,113 @@
+import time
+import warnings
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from .solver import ODESim
+
+# Schemes of ODESim that need several past values: restarted on every slice
+# from a single state they become a different method
+MULTISTEP_SCHEMES = ('midpoint', 'multi_step2')
+
+def propagate(times, scheme, model, init_value):
+    """ Trajectory of one scheme of ODESim over times starting from init_value """
+    sim = ODESim(times, [scheme], model, init_value)
+    sim.run_schemes()
+    return sim.v[0]
+
+class PararealSim(ODESim):
+    """ Parareal integration of the fine scheme over times: the time slices are
+    propagated in parallel by the fine scheme and corrected sequentially by the
+    coarse scheme run with coarse_ratio times larger time steps, until the
+    corrections of the slice boundaries fall below tol """
+    def __init__(self, times, fine, coarse, model, init_value, nslices,
+                    coarse_ratio=10, tol=1e-8, max_iter=None, nworkers=None, fig_dir=None):
+        for scheme in (fine, coarse):
+            if scheme in MULTISTEP_SCHEMES:
+                raise ValueError(f'Parareal needs one-step propagators, {scheme} is a multistep scheme')
+        super().__init__(times, [fine], model, init_value, fig_dir)
+        self.fine, self.coarse = fine, coarse
+        self.nslices = nslices
+        self.bounds = np.linspace(0, self.ntimes - 1, nslices + 1).astype(int)
+        if np.any(np.diff(self.bounds) < 1):
+            raise ValueError(f'Not enough time steps for {nslices:d} slices')
+        self.coarse_ratio = coarse_ratio
+        self.tol = tol
+        self.max_iter = nslices if max_iter is None else max_iter
+        self.nworkers = nworkers
+
+        # Convergence history
+        self.iterations = 0
+        self.corrections = []
+        self.t_parareal = None
+
+    def slice_times(self, n):
+        """ Fine times of slice n """
+        return self.times[self.bounds[n]:self.bounds[n + 1] + 1]
+
+    def coarse_times(self, n):
+        """ Uniform coarse times of slice n """
+        times = self.slice_times(n)
+        ncoarse = max(1, int(round((len(times) - 1) / self.coarse_ratio)))
+        return np.linspace(times[0], times[-1], ncoarse + 1)
+
+    def propagate_coarse(self, n, init_value):
+        return propagate(self.coarse_times(n), self.coarse, self.model, init_value)[-1]
+
+    def parareal(self, v):
+        """ Parareal iterations filling v with the fine trajectory """
+        U = np.zeros((self.nslices + 1, self.model.nd))
+        U[0] = self.v0
+        G = np.zeros((self.nslices, self.model.nd))
+        for n in range(self.nslices):
+            G[n] = self.propagate_coarse(n, U[n])
+            U[n + 1] = G[n]
+
+        fine = [None] * self.nslices
+        self.corrections = []
+        with ProcessPoolExecutor(self.nworkers) as pool:
+            for k in range(1, self.max_iter + 1):
+                # After k - 1 iterations the first k - 1 slices are converged
+                todo = range(k - 1, self.nslices)
+                trajectories = pool.map(propagate, [self.slice_times(n) for n in todo],
+                    [self.fine] * len(todo), [self.model] * len(todo), [U[n].copy() for n in todo])
+                for n, trajectory in zip(todo, trajectories):
+                    fine[n] = trajectory
+                U_new = U.copy()
+                for n in todo:
+                    g = self.propagate_coarse(n, U_new[n])
+                    U_new[n + 1] = g + fine[n][-1] - G[n]
+                    G[n] = g
+                self.corrections.append(np.max(np.abs(U_new - U)))
+                U = U_new
+                self.iterations = k
+                if self.corrections[-1] < self.tol:
+                    break
+            else:
+                warnings.warn(f'Parareal stopped after {self.max_iter:d} iterations with a '
+                    f'correction of {self.corrections[-1]:.1e} above tol = {self.tol:.1e}')
+
+        for n in range(self.nslices):
+            v[self.bounds[n]:self.bounds[n + 1] + 1] = fine[n]
+
+    def run_schemes(self):
+        """ Apply parareal to the fine scheme """
+        start = time.perf_counter()
+        self.parareal(self.v[0, :])
+        self.t_parareal = time.perf_counter() - start
+
+    def serial(self):
+        """ Serial fine trajectory and its wall time """
+        start = time.perf_counter()
+        v = propagate(self.times, self.fine, self.model, self.v0)
+        return v, time.perf_counter() - start
+
+    def report(self):
+        """ Print the convergence and the speedup against the serial fine integration """
+        v, t_serial = self.serial()
+        print(f'Parareal {self.fine}/{self.coarse} - {self.nslices:d} slices - '
+                f'coarse ratio = {self.coarse_ratio:d}')
+        print(f'    iterations = {self.iterations:d} - corrections = '
+                + ' '.join(f'{c:.1e}' for c in self.corrections))
+        print(f'    max difference with serial = {np.max(np.abs(self.v[0] - v)):.2e}')
+        print(f'    serial = {t_serial:.3e} s - parareal = {self.t_parareal:.3e} s - '
+                f'speedup = {t_serial / self.t_parareal:.2f}')
@@ -0,0 +1,117 @@
+import os
+import json
+import hashlib
+import inspect
+import argparse
+import numpy as np
+from numpy.polynomial import chebyshev
+from .utils import create_dir, jacobian
+
+# Version of the layout of the cached references, part of the content hash
+REFERENCE_VERSION = 1
+
+# Degree of the Chebyshev polynomials of the dense output on each step
+# (the Radau IIA collocation polynomial is cubic)
+DEGREE = 3
+
+class Reference:
+    """ Dense output of a reference solution: one Chebyshev polynomial per
+    step between the breakpoints, each with coefficients of shape (degree + 1, nd) """
+    def __init__(self, breaks, coeffs, stats=None):
+        self.breaks = np.asarray(breaks, dtype=float)
+        self.coeffs = np.asarray(coeffs, dtype=float)
+        self.stats = {} if stats is None else stats
+
+    def __call__(self, times):
+        """ Values of the reference at times, of shape (len(times), nd) """
+        times = np.atleast_1d(np.asarray(times, dtype=float))
+        if np.any(times < self.breaks[0]) or np.any(times > self.breaks[-1]):
+            raise ValueError(f'Reference only defined on [{self.breaks[0]:.3e}, {self.breaks[-1]:.3e}]')
+        i_seg = np.clip(np.searchsorted(self.breaks, times, side='right') - 1, 0, len(self.breaks) - 2)
+        t0, t1 = self.breaks[i_seg], self.breaks[i_seg + 1]
+        x = (2 * times - t0 - t1) / (t1 - t0)
+        # Clenshaw recurrence vectorized over the requested times
+        coeffs = self.coeffs[i_seg]
+        b1, b2 = np.zeros(coeffs[:, 0].shape), np.zeros(coeffs[:, 0].shape)
+        for k in range(coeffs.shape[1] - 1, 0, -1):
+            b1, b2 = coeffs[:, k] + 2 * x[:, None] * b1 - b2, b1
+        return coeffs[:, 0] + x[:, None] * b1 - b2
+
+    def save(self, filename):
+        np.savez(filename, breaks=self.breaks, coeffs=self.coeffs, stats=json.dumps(self.stats))
+
+    @classmethod
+    def load(cls, filename):
+        with np.load(filename) as data:
+            return cls(data['breaks'], data['coeffs'], json.loads(str(data['stats'])))
+
+def model_source(model):
+    """ Source code of the model class, the name of the class if unavailable """
+    try:
+        return inspect.getsource(type(model))
+    except (OSError, TypeError):
+        return type(model).__qualname__
+
+def reference_hash(model, t0, tend, v0, rtol, atol):
+    """ Content hash of a reference: source and state of the model, initial
+    value, time span and solver settings """
+    content = json.dumps({'version': REFERENCE_VERSION, 'degree': DEGREE,
+        'class': type(model).__qualname__, 'source': model_source(model),
+        'state': vars(model), 'v0': np.atleast_1d(v0).tolist(), 'tspan': [t0, tend],
+        'rtol': rtol, 'atol': np.atleast_1d(atol).tolist()},
+        sort_keys=True, default=lambda x: np.asarray(x).tolist())
+    return hashlib.sha256(content.encode()).hexdigest()
+
+def compute_reference(model, t0, tend, v0, rtol=1e-12, atol=1e-14):
+    """ Reference solution by a tight tolerance Radau IIA run whose dense
+    output is sampled at the Chebyshev points of each step """
+    from scipy.integrate import solve_ivp
+    fun = lambda t, u: np.atleast_1d(model.f(u, t))
+    jac = lambda t, u: jacobian(model, u, t)
+    sol = solve_ivp(fun, (t0, tend), np.atleast_1d(np.asarray(v0, dtype=float)), method='Radau',
+        rtol=rtol, atol=atol, jac=jac, dense_output=True)
+    if not sol.success:
+        raise RuntimeError(f'Reference computation failed: {sol.message}')
+    breaks = sol.t
+    nodes = np.cos(np.pi * (np.arange(DEGREE + 1) + 0.5) / (DEGREE + 1))
+    coeffs = np.zeros((len(breaks) - 1, DEGREE + 1, len(sol.y)))
+    for i in range(len(breaks) - 1):
+        times = 0.5 * (breaks[i] + breaks[i + 1]) + 0.5 * (breaks[i + 1] - breaks[i]) * nodes
+        coeffs[i] = chebyshev.chebfit(nodes, sol.sol(times).T, DEGREE)
+    return Reference(breaks, coeffs, {'nfev': int(sol.nfev), 'njev': int(sol.njev),
+        'nlu': int(sol.nlu), 'nsteps': len(breaks) - 1})
+
+def reference(model, t0, tend, v0, rtol=1e-12, atol=1e-14, cache_dir='references', recompute=False):
+    """ Reference solution of the model from the cache, computed and stored
+    under its content hash if missing so that any change to the model code,
+    its parameters, the initial value, the time span or the tolerances
+    gives a new reference """
+    filename = os.path.join(cache_dir, reference_hash(model, t0, tend, v0, rtol, atol) + '.npz')
+    if os.path.exists(filename) and not recompute:
+        return Reference.load(filename)
+    ref = compute_reference(model, t0, tend, v0, rtol, atol)
+    create_dir(cache_dir)
+    # Write then rename so that concurrent readers never see a partial file
+    tmp_filename = filename[:-4] + f'.{os.getpid():d}.npz'
+    ref.save(tmp_filename)
+    os.replace(tmp_filename, filename)
+    return ref
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Manage the cache of reference solutions')
+    parser.add_argument('-d', '--cache-dir', default='references')
+    parser.add_argument('--clear', action='store_true', help='Remove every cached reference')
+    args = parser.parse_args()
+
+    filenames = sorted(f for f in os.listdir(args.cache_dir) if f.endswith('.npz')) \
+        if os.path.isdir(args.cache_dir) else []
+    for filename in filenames:
+        path = os.path.join(args.cache_dir, filename)
+        if args.clear:
+            os.remove(path)
+        else:
+            ref = Reference.load(path)
+            print(f'{filename[:16]} - t = [{ref.breaks[0]:.3e}, {ref.breaks[-1]:.3e}] - '
+                f'nd = {ref.coeffs.shape[2]:d} - {os.path.getsize(path) / 2**10:.1f} kB')
+    if args.clear:
+        print(f'Removed {len(filenames):d} references from {args.cache_dir}')
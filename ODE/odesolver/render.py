@@ -0,0 +1,82 @@
+import os
+import sys
+import json
+import argparse
+import importlib
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+
+def model_module(model):
+    """ Importable module name of the model class, a model defined in a case
+    script run as __main__ being importable from the script name """
+    module = type(model).__module__
+    if module == '__main__':
+        module = os.path.splitext(os.path.basename(sys.modules['__main__'].__file__))[0]
+    return module
+
+def save_bundle(filename, model, times, v, figtitle, figname):
+    """ Write the npz result bundle of one trajectory with what is needed
+    to rebuild the model and call its plot method """
+    np.savez(filename, times=times, v=v, figtitle=figtitle, figname=figname,
+        model_module=model_module(model), model_class=type(model).__name__,
+        model_state=json.dumps(vars(model), default=float))
+
+def load_bundle(filename):
+    """ Rebuild the model and the arguments of its plot method from a bundle """
+    with np.load(filename) as bundle:
+        module = importlib.import_module(str(bundle['model_module']))
+        cls = getattr(module, str(bundle['model_class']))
+        model = cls.__new__(cls)
+        model.__dict__.update(json.loads(str(bundle['model_state'])))
+        return model, (bundle['times'], bundle['v'], str(bundle['figtitle']), str(bundle['figname']))
+
+def render_bundle(filename):
+    """ Render the figure of a result bundle with the Agg backend """
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    model, args = load_bundle(filename)
+    model.plot(*args)
+    plt.close('all')
+    return filename
+
+class Renderer:
+    """ Render result bundles in a background process pool, or only keep
+    the bundles when plot is False """
+    def __init__(self, plot=True, nworkers=None):
+        self.plot = plot
+        self.pool = ProcessPoolExecutor(nworkers) if plot else None
+        self.futures = []
+
+    def submit(self, filename):
+        """ Queue the rendering of a bundle """
+        if self.plot:
+            self.futures.append(self.pool.submit(render_bundle, filename))
+
+    def close(self):
+        """ Wait for the pending figures, raising the first rendering error """
+        if self.pool is not None:
+            try:
+                for future in self.futures:
+                    future.result()
+            finally:
+                self.pool.shutdown()
+                self.futures = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Render figures from result bundles, '
+        'to be run from the directory of the case scripts')
+    parser.add_argument('bundles', help='npz result bundles', nargs='+')
+    parser.add_argument('-w', '--workers', type=int, default=None,
+        help='Number of rendering processes')
+    args = parser.parse_args()
+    sys.path.insert(0, os.getcwd())
+    with ProcessPoolExecutor(args.workers) as pool:
+        for filename in pool.map(render_bundle, args.bundles):
+            print(f'Rendered {filename}')
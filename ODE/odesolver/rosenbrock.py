@@ -0,0 +1,116 @@
+import numpy as np
+from scipy.linalg import lu_factor, lu_solve
+from .utils import jacobian
+
+class RosenbrockMethod:
+    """ Rosenbrock method in the transformed form of Hairer and Wanner: each
+    stage solves (I / (dt gamma) - J) K_i = f(t + alpha_i dt, v + sum_j a_ij K_j)
+    + sum_j c_ij K_j / dt + dt gammas_i df/dt, then v_new = v + sum_i m_i K_i
+    and the embedded error estimate is sum_i e_i K_i """
+    def __init__(self, name, gamma, a, c, m, e, alpha, gammas, order, order_emb, w_method=False):
+        self.name = name
+        self.gamma = gamma
+        self.a = np.array(a, dtype=float)
+        self.c = np.array(c, dtype=float)
+        self.m = np.array(m, dtype=float)
+        self.e = np.array(e, dtype=float)
+        self.alpha = np.array(alpha, dtype=float)
+        self.gammas = np.array(gammas, dtype=float)
+        self.nstages = len(self.m)
+        self.order = order
+        self.order_emb = order_emb
+        # Order kept with any approximation of the Jacobian
+        self.w_method = w_method
+
+# ROS2 of Verwer et al. (1999): L-stable, order 2 for any Jacobian (W-method)
+_g = 1 + 1 / np.sqrt(2)
+ROS2 = RosenbrockMethod('ros2', _g,
+    a=[[0, 0], [1 / _g, 0]],
+    c=[[0, 0], [-2 / _g, 0]],
+    m=[3 / (2 * _g), 1 / (2 * _g)],
+    e=[1 / (2 * _g), 1 / (2 * _g)],
+    alpha=[0, 1], gammas=[_g, -_g], order=2, order_emb=1, w_method=True)
+
+# ROS3P of Lang and Verwer (2001): A-stable, order 3 without order reduction
+_g = 0.5 + np.sqrt(3) / 6
+ROS3P = RosenbrockMethod('ros3p', _g,
+    a=[[0, 0, 0], [1 / _g, 0, 0], [1 / _g, 0, 0]],
+    c=[[0, 0, 0], [-1 / _g**2, 0, 0], [-3.464101615137755, -1.732050807568877, 0]],
+    m=[2.0, 5.773502691896258e-01, 4.226497308103742e-01],
+    e=[-1.132486540518712e-01, -4.226497308103742e-01, 0],
+    alpha=[0, 1, 1], gammas=[_g, _g - 1, 0.5 - 2 * _g], order=3, order_emb=2)
+
+# RODAS3 of Sandu et al. (1997): stiffly accurate, L-stable, order 3
+RODAS3 = RosenbrockMethod('rodas3', 0.5,
+    a=[[0, 0, 0, 0], [0, 0, 0, 0], [2, 0, 0, 0], [2, 0, 1, 0]],
+    c=[[0, 0, 0, 0], [4, 0, 0, 0], [1, -1, 0, 0], [1, -1, -8 / 3, 0]],
+    m=[2, 0, 1, 1],
+    e=[0, 0, 0, 1],
+    alpha=[0, 0, 1, 1], gammas=[0.5, 1.5, 0, 0], order=3, order_emb=2)
+
+METHODS = {method.name: method for method in (ROS2, ROS3P, RODAS3)}
+
+def df_dt(model, u, t):
+    """ Time derivative of the model rhs, analytic when the model provides df_dt """
+    if hasattr(model, 'df_dt'):
+        return model.df_dt(u, t)
+    dt = np.sqrt(np.finfo(float).eps) * max(1.0, abs(t))
+    return (model.f(u, t + dt) - model.f(u, t)) / dt
+
+def rosenbrock_step(method, model, v, t, dt, jac):
+    """ One step of a Rosenbrock method from v at t with the Jacobian jac:
+    one LU factorization and no nonlinear iterations. Return the new value
+    and the embedded error estimate. """
+    v = np.atleast_1d(v)
+    lu = lu_factor(np.eye(len(v)) / (dt * method.gamma) - jac)
+    f_t = df_dt(model, v, t)
+    K = np.zeros((method.nstages, len(v)))
+    for i in range(method.nstages):
+        rhs = model.f(v + method.a[i, :i] @ K[:i], t + method.alpha[i] * dt) \
+                + method.c[i, :i] @ K[:i] / dt + dt * method.gammas[i] * f_t
+        K[i] = lu_solve(lu, rhs)
+    return v + method.m @ K, method.e @ K
+
+def integrate(model, t0, tend, v0, method=RODAS3, rtol=1e-6, atol=1e-10, dt0=None,
+                t_eval=None, jac_every=1, dt_max=np.inf):
+    """ Adaptive integration with a Rosenbrock method from t0 to tend, the step
+    being controlled by the embedded error estimate. The Jacobian is evaluated
+    every jac_every accepted steps (W-method when larger than one, only order
+    preserving with w_method tableaus). Return the output times (t_eval or
+    every accepted step), the solution at those times and the step statistics. """
+    v = np.atleast_1d(np.asarray(v0, dtype=float)).copy()
+    t = t0
+    t_out = np.array([tend]) if t_eval is None else np.asarray(t_eval, dtype=float)
+    times, values = [t0], [v.copy()]
+    dt = dt0 if dt0 is not None else 1e-6 * max(1.0, abs(tend - t0))
+    stats = {'accepted': 0, 'rejected': 0, 'jacobians': 0}
+    exponent = 1 / (method.order_emb + 1)
+    i_out = np.searchsorted(t_out, t0, side='right')
+    jac, age = None, jac_every
+    while t < tend and i_out < len(t_out):
+        if age >= jac_every:
+            jac = jacobian(model, v, t)
+            stats['jacobians'] += 1
+            age = 0
+        dt = min(dt, dt_max)
+        hit = t + dt >= t_out[i_out]
+        step = t_out[i_out] - t if hit else dt
+        v_new, err = rosenbrock_step(method, model, v, t, step, jac)
+        scale = atol + rtol * np.maximum(np.abs(v), np.abs(v_new))
+        err_norm = np.sqrt(np.mean((err / scale)**2))
+        fac = min(6.0, max(0.2, 0.9 * (err_norm if err_norm > 0 else 1e-10)**(- exponent)))
+        if err_norm <= 1:
+            t, v = t + step, v_new
+            stats['accepted'] += 1
+            age += 1
+            if hit:
+                t = t_out[i_out]
+                i_out += 1
+            if hit or t_eval is None:
+                times.append(t)
+                values.append(v.copy())
+            dt = step * fac if hit else dt * fac
+        else:
+            stats['rejected'] += 1
+            dt = step * fac
+    return np.array(times), np.array(values), stats
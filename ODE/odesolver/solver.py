@@ -1,6 +1,10 @@
 import numpy as np
 import matplotlib.pyplot as plt
 from .utils import create_dir
+from .render import save_bundle
+from .utils import jacobian
+from .rosenbrock import ROS2, ROS3P, RODAS3, rosenbrock_step
+from .imex import IMEX_EULER, IMEX_SSP2, ARK3, ARK4, imex_step
 
 class ODESim:
     def __init__(self, times, schemes, model, init_value, fig_dir=None):
@@ -57,15 +61,81 @@ class ODESim:
             v[i] = self.model.ftrapez(v[i - 1], self.times[i - 1], self.dt)
         print(v.shape)
     
+    def rosenbrock(self, v, method):
+        """ Linearly implicit Rosenbrock method: one Jacobian and one LU
+        factorization per step, no nonlinear iterations """
+        v[0] = self.v0
+        for i in range(1, self.ntimes):
+            jac = jacobian(self.model, v[i - 1], self.times[i - 1])
+            v[i] = rosenbrock_step(method, self.model, v[i - 1], self.times[i - 1], self.dt, jac)[0]
+
+    def ros2(self, v):
+        """ Second order L-stable Rosenbrock W-method """
+        self.rosenbrock(v, ROS2)
+
+    def ros3p(self, v):
+        """ Third order A-stable Rosenbrock method """
+        self.rosenbrock(v, ROS3P)
+
+    def rodas3(self, v):
+        """ Third order stiffly accurate Rosenbrock method """
+        self.rosenbrock(v, RODAS3)
+
+    def imex(self, v, method):
+        """ Additive Runge-Kutta method: only the stiff part f_stiff of the
+        model is treated implicitly, the non-stiff part f_nonstiff explicitly """
+        v[0] = self.v0
+        for i in range(1, self.ntimes):
+            v[i] = imex_step(method, self.model, v[i - 1], self.times[i - 1], self.dt)
+
+    def imexEuler(self, v):
+        """ First order forward-backward Euler """
+        self.imex(v, IMEX_EULER)
+
+    def imexSSP2(self, v):
+        """ Second order IMEX-SSP2(2,2,2), not stiffly accurate: it loses its
+        accuracy at large steps when the explicit part scales with the stiffness """
+        self.imex(v, IMEX_SSP2)
+
+    def ark3(self, v):
+        """ Third order L-stable additive Runge-Kutta ARK3(2)4L[2]SA """
+        self.imex(v, ARK3)
+
+    def ark4(self, v):
+        """ Fourth order L-stable additive Runge-Kutta ARK4(3)6L[2]SA """
+        self.imex(v, ARK4)
+
     def run_schemes(self):
         """ Apply scheme and plot the results """
         for i_scheme, name_scheme in enumerate(self.schemes):
             scheme = getattr(self, name_scheme)
             scheme(self.v[i_scheme, :])
     
-    def plot(self, figname=None):
+    def output_name(self, name_scheme, figname=None):
+        """ Path of the figure (and bundle) of a scheme, figname being
+        suffixed by the scheme name when several schemes are run """
+        name = self.fig_dir + (name_scheme if figname is None else figname)
+        if figname is not None and self.nschemes > 1:
+            name += f'_{name_scheme}'
+        return name
+
+    def dump(self, figname=None):
+        """ Write one result bundle per scheme and return their filenames """
+        filenames = []
+        for i_scheme, name_scheme in enumerate(self.schemes):
+            name = self.output_name(name_scheme, figname)
+            save_bundle(name + '.npz', self.model, self.times, self.v[i_scheme, :],
+                f'{name_scheme} - dt = {self.dt:.2e}', name)
+            filenames.append(name + '.npz')
+        return filenames
+
+    def plot(self, figname=None, renderer=None):
+        """ Plot the results inline or, if a renderer is given, dump them and
+        let the renderer draw the figures in the background """
+        if renderer is not None:
+            for filename in self.dump(figname):
+                renderer.submit(filename)
+            return
         for i_scheme, name_scheme in enumerate(self.schemes):
-            if figname is None:
-                self.model.plot(self.times, self.v[i_scheme, :], f'{name_scheme} - dt = {self.dt:.2e}', self.fig_dir + name_scheme)
-            else:
-                self.model.plot(self.times, self.v[i_scheme, :], f'{name_scheme} - dt = {self.dt:.2e}', self.fig_dir + figname)
+            self.model.plot(self.times, self.v[i_scheme, :], f'{name_scheme} - dt = {self.dt:.2e}',
+                self.output_name(name_scheme, figname))
@@ -10,4 +10,29 @@ def make_times(tmin, tend, dt):
     times = [tmin]
     while (times[-1] < tend):
         times.append(times[-1] + dt)
-    return np.array(times)
\ No newline at end of file
+    return np.array(times)
+
+def jacobian_fd(f, u, t):
+    """ Jacobian of f(u, t) with respect to u by forward finite differences """
+    u = np.atleast_1d(np.asarray(u, dtype=float))
+    f0 = np.atleast_1d(f(u, t))
+    jac = np.zeros((len(f0), len(u)))
+    for j in range(len(u)):
+        du = np.sqrt(np.finfo(float).eps) * max(1.0, abs(u[j]))
+        u_pert = u.copy()
+        u_pert[j] += du
+        jac[:, j] = (np.atleast_1d(f(u_pert, t)) - f0) / du
+    return jac
+
+def jacobian(model, u, t):
+    """ Jacobian of the model rhs, analytic when the model provides jac_f """
+    if hasattr(model, 'jac_f'):
+        return np.atleast_2d(model.jac_f(u, t))
+    return jacobian_fd(model.f, u, t)
+
+def jacobian_stiff(model, u, t):
+    """ Jacobian of the stiff part of the model rhs, analytic when the model
+    provides jac_stiff """
+    if hasattr(model, 'jac_stiff'):
+        return np.atleast_2d(model.jac_stiff(u, t))
+    return jacobian_fd(model.f_stiff, u, t)
@@ -0,0 +1,274 @@
+import argparse
+import numpy as np
+from numba import njit
+
+from fd_schemes import bjs, cast_coeffs
+from test_funcs import gaussian, step, packet_wave
+
+@njit(cache=True)
+def coarse_value(cdata_old, cdata_new, cslot, bs, ng, p, theta):
+    """ Value of the periodic coarse cell p interpolated at the fraction theta
+    of the coarse time step """
+    p = p % (len(cslot) * bs)
+    k = cslot[p // bs]
+    return (1 - theta) * cdata_old[k, ng + p % bs] + theta * cdata_new[k, ng + p % bs]
+
+@njit(cache=True)
+def prolong(cdata_old, cdata_new, cslot, bs, ng, i, theta):
+    """ Conservative prolongation to the fine cell i: piecewise linear
+    reconstruction of the coarse cell with a minmod slope """
+    p = i // 2
+    uc = coarse_value(cdata_old, cdata_new, cslot, bs, ng, p, theta)
+    dl = uc - coarse_value(cdata_old, cdata_new, cslot, bs, ng, p - 1, theta)
+    dr = coarse_value(cdata_old, cdata_new, cslot, bs, ng, p + 1, theta) - uc
+    slope = 0.0
+    if dl * dr > 0:
+        slope = dl if abs(dl) < abs(dr) else dr
+    return uc + (0.25 if i % 2 else -0.25) * slope
+
+@njit(cache=True)
+def fill_ghosts(data, ids, slot, bs, ng, cdata_old, cdata_new, cslot, theta):
+    """ Fill the ghost cells of the blocks from their neighbours of the same
+    level or, where there is none, by prolongation of the coarser level """
+    n = len(slot) * bs
+    for k in range(len(ids)):
+        for g in range(ng):
+            for pos, i in ((g, ids[k] * bs - ng + g), (ng + bs + g, (ids[k] + 1) * bs + g)):
+                i = i % n
+                kn = slot[i // bs]
+                if kn >= 0:
+                    data[k, pos] = data[kn, ng + i % bs]
+                else:
+                    data[k, pos] = prolong(cdata_old, cdata_new, cslot, bs, ng, i, theta)
+
+@njit(cache=True)
+def advance_blocks(data, res, coeffs, ju, jd, ng):
+    """ One iteration of the scheme on every block with filled ghost cells,
+    with the arithmetic of advance_fd """
+    bs = data.shape[1] - 2 * ng
+    for k in range(data.shape[0]):
+        for i in range(ng, ng + bs):
+            acc = coeffs[0] - coeffs[0]
+            for j in range(-ju, jd + 1):
+                acc -= coeffs[ju + j] * data[k, i + j]
+            res[i] = acc + data[k, i]
+        for i in range(ng, ng + bs):
+            data[k, i] -= res[i]
+
+@njit(cache=True)
+def restrict(fdata, fids, cdata, cslot, bs, ng):
+    """ Conservative restriction: coarse cells covered by fine blocks are set
+    to the mean of their two children """
+    for k in range(len(fids)):
+        kc = cslot[fids[k] // 2]
+        off = (fids[k] % 2) * bs // 2
+        for i in range(bs // 2):
+            cdata[kc, ng + off + i] = 0.5 * (fdata[k, ng + 2 * i] + fdata[k, ng + 2 * i + 1])
+
+@njit(cache=True)
+def prolong_blocks(fdata, fids, rows, bs, ng, cdata, cslot):
+    """ Initialize the given rows of the fine blocks by prolongation """
+    for k in rows:
+        for i in range(bs):
+            fdata[k, ng + i] = prolong(cdata, cdata, cslot, bs, ng, fids[k] * bs + i, 1.0)
+
+class BlockAMR:
+    """ Block-structured adaptive mesh refinement for the periodic FD schemes
+    of bjs. Level 0 is a uniform grid of ncx cells on [xmin, xmax) split in
+    blocks of bs cells. Each level refines blocks of the level below by 2 in
+    space and time (subcycling at constant CFL). The blocks of a level are
+    stored in one compact array with ng ghost cells on each side. Restriction
+    and prolongation are conservative but coarse-fine fluxes are not
+    corrected (no refluxing). """
+    def __init__(self, xmin, xmax, ncx, bs, max_level, sigma, scheme,
+                    tol=0.05, regrid=8, criterion='gradient'):
+        if ncx % bs != 0 or bs % 2 != 0:
+            raise ValueError('ncx must be a multiple of the block size bs, which must be even')
+        coeffs, self.ju, self.jd = bjs(sigma, scheme)
+        self.ng = max(self.ju, self.jd)
+        if self.ng > bs // 2:
+            raise ValueError(f'Block size {bs:d} too small for the stencil of {scheme}')
+        self.res = np.zeros(bs + 2 * self.ng)
+        self.coeffs = cast_coeffs(coeffs, self.res)
+        self.xmin, self.Lx, self.ncx, self.bs = xmin, xmax - xmin, ncx, bs
+        self.max_level = max_level
+        self.tol, self.regrid_every, self.criterion = tol, regrid, criterion
+        # Level 0 covers the domain
+        nb = ncx // bs
+        self.ids = [np.arange(nb)]
+        self.slot = [np.arange(nb)]
+        self.data = [np.zeros((nb, bs + 2 * self.ng))]
+        self.old = [None]
+        self.nsteps = 0
+        self.cell_updates = 0
+
+    def nlevels(self):
+        return len(self.ids)
+
+    def finest_level(self):
+        """ Deepest level holding blocks, regridding may leave an empty level on top """
+        return max(level for level in range(self.nlevels()) if len(self.ids[level]) > 0)
+
+    def dx(self, level):
+        return self.Lx / self.ncx / 2**level
+
+    def centers(self, level, ids):
+        """ Cell centers of the given blocks of a level, one row per block """
+        cells = ids[:, np.newaxis] * self.bs + np.arange(self.bs)
+        return self.xmin + (cells + 0.5) * self.dx(level)
+
+    def initialize(self, profile, *params):
+        """ Sample profile at the cell centers, building the initial hierarchy """
+        for i in range(self.max_level + 1):
+            if i > 0:
+                self.regrid()
+            for level in range(self.nlevels()):
+                self.data[level][:, self.ng:-self.ng] = profile(
+                    self.centers(level, self.ids[level]), *params)
+
+    def flag(self, level):
+        """ Blocks of a level to refine from the undivided differences of the
+        solution (gradient criterion) or where they are large at an extremum
+        or a discontinuity, where limiters switch off (limiter criterion) """
+        self.fill_ghosts(level, 1.0)
+        u = self.data[level][:, self.ng - 1:self.ng + self.bs + 1]
+        du = np.diff(u, axis=1)
+        flags = np.abs(du) > self.tol
+        if self.criterion == 'limiter':
+            with np.errstate(divide='ignore', invalid='ignore'):
+                r = du[:, :-1] / du[:, 1:]
+            flags = flags[:, 1:] & ~(r > 0)
+        elif self.criterion != 'gradient':
+            raise ValueError(f'Unknown refinement criterion {self.criterion}')
+        block_flags = np.zeros(len(self.slot[level]), dtype=bool)
+        block_flags[self.ids[level]] = flags.any(axis=1)
+        return block_flags
+
+    def regrid(self):
+        """ Rebuild the levels above 0 from the refinement flags, adding one
+        buffer block on each side and keeping the levels properly nested """
+        for level in range(self.max_level):
+            present = self.slot[level] >= 0
+            flags = self.flag(level)
+            flags |= (np.roll(flags, 1) | np.roll(flags, -1))
+            flags &= present & np.roll(present, 1) & np.roll(present, -1)
+            parents = np.flatnonzero(flags)
+            ids = np.sort(np.concatenate([2 * parents, 2 * parents + 1]))
+            slot = -np.ones(2 * len(self.slot[level]), dtype=np.int64)
+            slot[ids] = np.arange(len(ids))
+            data = np.zeros((len(ids), self.bs + 2 * self.ng))
+            # Keep the existing fine blocks, prolong the new ones
+            if level + 1 < self.nlevels():
+                old_slot = self.slot[level + 1][ids]
+                kept = old_slot >= 0
+                data[kept] = self.data[level + 1][old_slot[kept]]
+            else:
+                kept = np.zeros(len(ids), dtype=bool)
+                self.ids.append(None), self.slot.append(None)
+                self.data.append(None), self.old.append(None)
+            prolong_blocks(data, ids, np.flatnonzero(~kept), self.bs, self.ng,
+                self.data[level], self.slot[level])
+            self.ids[level + 1], self.slot[level + 1], self.data[level + 1] = ids, slot, data
+            if len(ids) == 0:
+                del self.ids[level + 2:], self.slot[level + 2:], self.data[level + 2:], self.old[level + 2:]
+                break
+
+    def fill_ghosts(self, level, theta):
+        """ Fill the ghost cells of a level, the coarser level being taken at
+        the fraction theta of its last time step """
+        parent = max(level - 1, 0)
+        cdata_old = self.old[parent] if 0 < level and theta < 1 else self.data[parent]
+        fill_ghosts(self.data[level], self.ids[level], self.slot[level], self.bs, self.ng,
+            cdata_old, self.data[parent], self.slot[parent], theta)
+
+    def advance_level(self, level, theta):
+        """ Advance a level by its time step then, recursively, the finer
+        levels by two substeps and restrict them back """
+        finer = level + 1 < self.nlevels() and len(self.ids[level + 1]) > 0
+        if finer:
+            self.old[level] = self.data[level].copy()
+        self.fill_ghosts(level, theta)
+        advance_blocks(self.data[level], self.res, self.coeffs, self.ju, self.jd, self.ng)
+        self.cell_updates += self.data[level].shape[0] * self.bs
+        if finer:
+            for substep in range(2):
+                self.advance_level(level + 1, substep / 2)
+            restrict(self.data[level + 1], self.ids[level + 1], self.data[level],
+                self.slot[level], self.bs, self.ng)
+
+    def step(self):
+        """ One time step of the base level, regridding periodically """
+        if self.nsteps > 0 and self.nsteps % self.regrid_every == 0:
+            self.regrid()
+        self.advance_level(0, 0.0)
+        self.nsteps += 1
+
+    def its(self, nt):
+        for _ in range(nt):
+            self.step()
+
+    def composite(self):
+        """ Cell centers, sizes and values of the leaf cells sorted along x """
+        x, dx, u = [], [], []
+        for level in range(self.nlevels()):
+            ids = self.ids[level]
+            leaf = np.ones((len(ids), self.bs), dtype=bool)
+            if level + 1 < self.nlevels():
+                children = 2 * ids[:, np.newaxis] + (np.arange(self.bs) >= self.bs // 2)
+                leaf = self.slot[level + 1][children] < 0
+            x.append(self.centers(level, ids)[leaf])
+            dx.append(np.full(leaf.sum(), self.dx(level)))
+            u.append(self.data[level][:, self.ng:-self.ng][leaf])
+        x, dx, u = np.concatenate(x), np.concatenate(dx), np.concatenate(u)
+        order = np.argsort(x)
+        return x[order], dx[order], u[order]
+
+def amr_L1error(amr, t, a, profile, *params):
+    """ L1 error of the composite solution against the exactly translated
+    profile, weighted by the cell sizes """
+    x, dx, u = amr.composite()
+    x_ex = amr.xmin + (x - amr.xmin - a * t) % amr.Lx
+    return np.sum(np.abs(u - profile(x_ex, *params)) * dx) / amr.Lx
+
+def compare_uniform(ncx, bs, levels, sigma, scheme, tol, regrid, criterion, n_periods,
+                        name, profile, *params):
+    """ Print the L1 error and number of cell updates of uniform grids and of
+    AMR hierarchies with the same finest resolutions """
+    xmin, xmax, a = -1.0, 1.0, 1.0
+    print(f'\n{name} - {scheme} - CFL = {sigma:.2f} - {n_periods:.1f} periods')
+    print(f"{'grid':>8s} {'levels':>6s} {'finest nx':>10s} {'L1 error':>10s} {'cell updates':>13s}")
+    for level in range(levels + 1):
+        for kind in ('uniform', 'AMR'):
+            if kind == 'AMR' and level == 0:
+                continue
+            if kind == 'uniform':
+                amr = BlockAMR(xmin, xmax, ncx * 2**level, bs, 0, sigma, scheme)
+            else:
+                amr = BlockAMR(xmin, xmax, ncx, bs, level, sigma, scheme, tol, regrid, criterion)
+            amr.initialize(profile, *params)
+            dt = sigma * amr.dx(0) / a
+            nt = int(round(n_periods * amr.Lx / a / dt))
+            amr.its(nt)
+            err = amr_L1error(amr, nt * dt, a, profile, *params)
+            # Finest resolution actually reached, regridding may build fewer levels
+            finest = amr.finest_level()
+            print(f'{kind:>8s} {finest:6d} {amr.ncx * 2**finest:10d} '
+                    f'{err:10.3e} {amr.cell_updates:13d}')
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-s', '--scheme', help='Name of the scheme', default='LW')
+    parser.add_argument('--cfl', type=float, default=0.5)
+    parser.add_argument('--ncx', type=int, default=200, help='Number of cells of the base level')
+    parser.add_argument('--bs', type=int, default=8, help='Block size')
+    parser.add_argument('--levels', type=int, default=3, help='Number of refined levels')
+    parser.add_argument('--tol', type=float, default=0.02, help='Refinement threshold')
+    parser.add_argument('--regrid', type=int, default=4, help='Number of base steps between regrids')
+    parser.add_argument('--criterion', choices=['gradient', 'limiter'], default='gradient')
+    parser.add_argument('--periods', type=float, default=1.0)
+    args = parser.parse_args()
+    cases = [('step', step, 0.0), ('packet_wave', packet_wave, 0.0, 0.25),
+                ('gaussian', gaussian, 0.0, 0.3)]
+    for name, profile, *params in cases:
+        compare_uniform(args.ncx, args.bs, args.levels, args.cfl, args.scheme, args.tol,
+            args.regrid, args.criterion, args.periods, name, profile, *params)
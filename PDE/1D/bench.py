@@ -0,0 +1,237 @@
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import resource
+import tempfile
+import subprocess
+import tracemalloc
+import numpy as np
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+
+# Version of the layout of the JSON result files
+BENCH_VERSION = 2
+
+# Code timed in a fresh interpreter: imports of the driver then first call
+# of every kernel (compilation or loading from the Numba cache)
+STARTUP_SNIPPET = """
+import json, time
+start = time.perf_counter()
+import main
+imported = time.perf_counter()
+from warmup import warmup, KERNELS
+warmup()
+kernels = time.perf_counter() - imported
+stats = [kernel.stats for kernel in KERNELS]
+print(json.dumps({'import': imported - start, 'kernels': kernels,
+    'cache_hits': sum(sum(s.cache_hits.values()) for s in stats),
+    'cache_misses': sum(sum(s.cache_misses.values()) for s in stats)}))
+"""
+
+def run_startup(cache_dir):
+    """ Time the startup of a fresh interpreter using cache_dir as Numba cache """
+    env = dict(os.environ, NUMBA_CACHE_DIR=cache_dir)
+    start = time.perf_counter()
+    out = subprocess.run([sys.executable, '-c', STARTUP_SNIPPET], env=env, check=True,
+        capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+    timings = json.loads(out.stdout.splitlines()[-1])
+    timings['total'] = time.perf_counter() - start
+    return timings
+
+def bench_startup(repeats):
+    """ Cold (empty Numba cache) and warm (filled cache) startup times """
+    results = {'cold': [], 'warm': []}
+    for _ in range(repeats):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            results['cold'].append(run_startup(cache_dir))
+            results['warm'].append(run_startup(cache_dir))
+    print(f"{'startup':>8s} {'import [s]':>11s} {'kernels [s]':>12s} {'total [s]':>10s} "
+            f"{'cache hits':>10s} {'misses':>6s}")
+    for kind, runs in results.items():
+        print(f"{kind:>8s} {np.median([r['import'] for r in runs]):11.3f} "
+            f"{np.median([r['kernels'] for r in runs]):12.3f} {np.median([r['total'] for r in runs]):10.3f} "
+            f"{min(r['cache_hits'] for r in runs):10d} {max(r['cache_misses'] for r in runs):6d}")
+    if any(r['cache_misses'] for r in results['warm']):
+        print('Warning: kernels recompiled with a filled cache, warm startup is not cached')
+    return results
+
+def time_kernel(nt, u, sigma, scheme, res_dtype, threads):
+    """ Wall time of nt iterations of the serial kernel or of the stepping
+    phase of the domain decomposed one """
+    from fd_schemes import its_fd
+    from dd_schemes import its_fd_dd
+    if threads > 1:
+        return its_fd_dd(nt, u, sigma, scheme, threads, mixed=res_dtype != u.dtype)
+    res = np.zeros(len(u), dtype=res_dtype)
+    start = time.perf_counter()
+    its_fd(nt, res, u, sigma, scheme)
+    return time.perf_counter() - start
+
+def bench_compile(precisions):
+    """ Time of the first call (compilation or loading from the Numba cache)
+    of the serial and domain decomposed kernels for each signature, the
+    scheme and CFL not changing the signature """
+    from fd_schemes import its_fd, SCHEMES
+    from dd_schemes import warm_dd
+    from precision import PRECISIONS
+    results = []
+    for precision in precisions:
+        u_dtype, res_dtype = PRECISIONS[precision]
+        start = time.perf_counter()
+        its_fd(1, np.zeros(16, dtype=res_dtype), np.ones(16, dtype=u_dtype), 0.5, SCHEMES[0])
+        t_serial = time.perf_counter() - start
+        start = time.perf_counter()
+        warm_dd(u_dtype, res_dtype, 0.5, SCHEMES[0])
+        t_dd = time.perf_counter() - start
+        results.append({'precision': precision, 'its_fd_s': t_serial, 'dd_s': t_dd})
+        print(f"{precision:>9s} its_fd {t_serial:8.3f} s - dd kernels {t_dd:8.3f} s")
+    return results
+
+def bench_case(scheme, nx, cfl, precision, threads, updates, repeats):
+    """ Steady-state cell-updates per second and memory high-water marks of
+    one configuration, run by bench_kernels in a fresh process """
+    from precision import PRECISIONS
+    u_dtype, res_dtype = PRECISIONS[precision]
+    nt = max(10, int(updates // nx))
+    # Kernels loaded before measuring
+    time_kernel(1, np.ones(16, dtype=u_dtype), cfl, scheme, res_dtype, 1)
+    tracemalloc.start()
+    u0 = np.random.default_rng(0).random(nx).astype(u_dtype)
+    times = []
+    for _ in range(repeats):
+        u = u0.copy()
+        times.append(time_kernel(nt, u, cfl, scheme, res_dtype, threads))
+    peak_alloc = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {'scheme': scheme, 'nx': nx, 'cfl': cfl, 'precision': precision, 'threads': threads,
+            'nt': nt, 'time_s': min(times), 'updates_per_s': nx * nt / min(times),
+            'peak_alloc_bytes': peak_alloc,
+            'maxrss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+            'maxrss_children_kb': resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss}
+
+def bench_kernels(schemes, nxs, cfls, precisions, threads, updates, repeats):
+    """ Benchmark every combination of the parameters, each in a fresh
+    process so that the memory high-water marks are those of the case """
+    results = []
+    print(f"{'scheme':>6s} {'nx':>10s} {'cfl':>5s} {'precision':>9s} {'threads':>7s} "
+            f"{'updates/s':>10s} {'peak alloc [MB]':>15s} {'maxrss [MB]':>11s}")
+    ctx = mp.get_context('spawn')
+    for scheme in schemes:
+        for nx in nxs:
+            for cfl in cfls:
+                for precision in precisions:
+                    for nthreads in threads:
+                        with ProcessPoolExecutor(1, mp_context=ctx) as pool:
+                            r = pool.submit(bench_case, scheme, nx, cfl, precision, nthreads,
+                                    updates, repeats).result()
+                        results.append(r)
+                        print(f"{scheme:>6s} {nx:10d} {cfl:5.2f} {precision:>9s} {nthreads:7d} "
+                            f"{r['updates_per_s']:10.3e} {r['peak_alloc_bytes'] / 2**20:15.1f} "
+                            f"{r['maxrss_kb'] / 2**10:11.1f}")
+    return results
+
+def git_commit():
+    """ Commit of the working tree if it is a git repository """
+    try:
+        out = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)))
+    except OSError:
+        return None
+    return out.stdout.strip() if out.returncode == 0 else None
+
+def metadata():
+    """ Description of the machine and software the benchmark ran on """
+    import numba
+    return {'date': time.strftime('%Y-%m-%dT%H:%M:%S'), 'commit': git_commit(),
+            'python': platform.python_version(), 'numpy': np.__version__,
+            'numba': numba.__version__, 'platform': platform.platform(),
+            'processor': platform.processor(), 'cpu_count': os.cpu_count()}
+
+def write_results(filename, results):
+    """ Write versioned benchmark results, results mapping each kind of
+    benchmark to its measures """
+    with open(filename, 'w') as fp:
+        json.dump({'version': BENCH_VERSION, 'meta': metadata(), **results}, fp, indent=2)
+
+def read_results(filename):
+    with open(filename) as fp:
+        results = json.load(fp)
+    if results.get('version') != BENCH_VERSION:
+        raise ValueError(f'{filename} has version {results.get("version")}, '
+            f'expected {BENCH_VERSION}')
+    return results
+
+def compare(base_file, new_file, threshold):
+    """ Print the relative change of the new results against the base ones
+    and return the number of regressions beyond threshold """
+    base, new = read_results(base_file), read_results(new_file)
+    nregressions = 0
+    keys = ('scheme', 'nx', 'cfl', 'precision', 'threads')
+    base_kernels = {tuple(r[k] for k in keys): r for r in base.get('kernels', [])}
+    for r in new.get('kernels', []):
+        key = tuple(r[k] for k in keys)
+        if key not in base_kernels:
+            continue
+        change = r['updates_per_s'] / base_kernels[key]['updates_per_s'] - 1
+        regression = change < - threshold
+        nregressions += regression
+        print(f"{'REGRESSION' if regression else 'ok':>10s} {' '.join(map(str, key)):>40s} "
+                f"updates/s {change:+7.1%}")
+    for kind in set(base.get('startup', {})) & set(new.get('startup', {})):
+        t_base = np.median([t['total'] for t in base['startup'][kind]])
+        t_new = np.median([t['total'] for t in new['startup'][kind]])
+        change = t_new / t_base - 1
+        regression = change > threshold
+        nregressions += regression
+        print(f"{'REGRESSION' if regression else 'ok':>10s} {kind + ' startup':>40s} "
+                f"time {change:+7.1%}")
+    return nregressions
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmarks of the PDE/1D kernels')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    startup = subparsers.add_parser('startup', help='Cold and warm startup times')
+    startup.add_argument('-n', '--repeats', type=int, default=3)
+    startup.add_argument('-o', '--output', help='JSON file of the timings')
+    kernels = subparsers.add_parser('kernels', help='Cell-updates per second of the FD kernels')
+    kernels.add_argument('-s', '--schemes', nargs='+',
+        help='Schemes to benchmark, all the schemes of fd_schemes by default')
+    kernels.add_argument('--nxs', type=float, nargs='+', default=[1e3, 1e4, 1e5, 1e6],
+        help='Number of points (up to 1e8 on machines with enough memory)')
+    kernels.add_argument('--cfls', type=float, nargs='+', default=[0.5])
+    kernels.add_argument('-p', '--precisions', nargs='+', default=['double', 'single', 'mixed'])
+    kernels.add_argument('-t', '--threads', type=int, nargs='+', default=[1],
+        help='Numbers of subdomains of the domain decomposition (1 is the serial kernel)')
+    kernels.add_argument('--updates', type=float, default=1e8,
+        help='Number of cell updates per measure')
+    kernels.add_argument('-n', '--repeats', type=int, default=3)
+    kernels.add_argument('--cold', action='store_true',
+        help='Use an empty Numba cache so that compilation time is measured')
+    kernels.add_argument('-o', '--output', help='JSON file of the results')
+    comparison = subparsers.add_parser('compare', help='Flag regressions between two result files')
+    comparison.add_argument('base', help='Reference JSON results')
+    comparison.add_argument('new', help='New JSON results')
+    comparison.add_argument('--threshold', type=float, default=0.1,
+        help='Relative slowdown flagged as a regression')
+    args = parser.parse_args()
+
+    if args.command == 'startup':
+        results = bench_startup(args.repeats)
+        if args.output is not None:
+            write_results(args.output, {'startup': results})
+    elif args.command == 'kernels':
+        # Numba reads its cache directory when imported
+        if args.cold:
+            os.environ['NUMBA_CACHE_DIR'] = tempfile.mkdtemp()
+        from fd_schemes import SCHEMES
+        schemes = list(SCHEMES) if args.schemes is None else args.schemes
+        compile_results = bench_compile(args.precisions)
+        results = bench_kernels(schemes, [int(nx) for nx in args.nxs], args.cfls,
+            args.precisions, args.threads, args.updates, args.repeats)
+        if args.output is not None:
+            write_results(args.output, {'compile': compile_results, 'kernels': results})
+    elif args.command == 'compare':
+        sys.exit(1 if compare(args.base, args.new, args.threshold) else 0)
@@ -0,0 +1,172 @@
+import time
+import argparse
+import numpy as np
+import multiprocessing as mp
+from multiprocessing import shared_memory
+from numba import njit
+
+from fd_schemes import bjs, cast_coeffs, advance_fd, its_fd
+
+def split_domain(n, nsub):
+    """ Bounds of nsub contiguous subdomains covering the n points """
+    if nsub < 1 or nsub > n:
+        raise ValueError(f'Cannot split {n:d} points into {nsub:d} subdomains')
+    return [n * k // nsub for k in range(nsub + 1)]
+
+@njit(cache=True)
+def gather_halo(u_loc, u, start, hu):
+    """ Copy the points [start - hu, start - hu + len(u_loc)) of the periodic
+    array u into the local array u_loc """
+    n = len(u)
+    for i in range(len(u_loc)):
+        u_loc[i] = u[(start - hu + i) % n]
+
+@njit(cache=True)
+def its_fd_local(nt, res, u_loc, sigma, scheme, coeffs, ju, jd):
+    """ Iterations on a subdomain with ghost layers: the periodic wrap of
+    advance_fd only pollutes ju points on the left and jd points on the right
+    per iteration so that the interior stays exact while the halos last """
+    for _ in range(nt):
+        advance_fd(res, u_loc, sigma, scheme, coeffs, ju, jd)
+        u_loc -= res
+
+def warm_dd(dtype, res_dtype, sigma, scheme):
+    """ Compile (or load from the Numba cache) the kernels of the workers for
+    the given precisions, before forking so that the workers inherit them """
+    coeffs, ju, jd = bjs(sigma, scheme)
+    u_loc = np.zeros(16, dtype=dtype)
+    res = np.zeros(16, dtype=res_dtype)
+    gather_halo(u_loc, u_loc.copy(), 0, ju)
+    its_fd_local(0, res, u_loc, sigma, scheme, cast_coeffs(coeffs, res), ju, jd)
+
+def _worker(shm_name, n, dtype, res_dtype, start, end, nt, sigma, scheme, depth, barrier, timings):
+    """ Advance the points [start, end) of the shared array, exchanging halos
+    of depth iterations with the neighbours every depth iterations: only the
+    edge points needed by the neighbours go through the shared array, the
+    subdomain itself staying in the local array. The first worker records in
+    timings the start and end of the stepping phase. """
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        u = np.ndarray((n,), dtype=dtype, buffer=shm.buf)
+        coeffs, ju, jd = bjs(sigma, scheme)
+        hu, hd = depth * ju, depth * jd
+        m = end - start
+        u_loc = np.zeros(m + hu + hd, dtype=dtype)
+        res = np.zeros(len(u_loc), dtype=res_dtype)
+        coeffs = cast_coeffs(coeffs, res)
+        warm_dd(dtype, res_dtype, sigma, scheme)
+        gather_halo(u_loc, u, start, hu)
+        # Setup and kernel loading are over for everybody when stepping starts
+        barrier.wait()
+        if start == 0:
+            timings[0] = time.perf_counter()
+        done = 0
+        while done < nt:
+            k = min(depth, nt - done)
+            its_fd_local(k, res, u_loc, sigma, scheme, coeffs, ju, jd)
+            done += k
+            if done < nt:
+                # Publish the edges read by the neighbours, then read their
+                # edges into the ghost layers once everybody has published
+                u[start:start + hd] = u_loc[hu:hu + hd]
+                u[end - hu:end] = u_loc[m:m + hu]
+                barrier.wait()
+                gather_halo(u_loc[:hu], u, start, hu)
+                gather_halo(u_loc[hu + m:], u, end, 0)
+                barrier.wait()
+        u[start:end] = u_loc[hu:hu + m]
+        barrier.wait()
+        if start == 0:
+            timings[1] = time.perf_counter()
+        del u
+    finally:
+        shm.close()
+
+def its_fd_dd(nt, u, sigma, scheme, nsub, depth=1, mixed=False):
+    """ Domain decomposed counterpart of its_fd: u is advanced in place by nt
+    iterations over nsub worker processes sharing the array, with halo exchange
+    and synchronization every depth iterations. The stencil sum is done in
+    float64 if mixed and in the precision of u otherwise. The result is
+    bit-identical to its_fd. Return the wall time of the stepping phase,
+    without process startup, shared memory copies and kernel loading. """
+    if depth < 1:
+        raise ValueError('Halo depth must be at least one iteration')
+    bounds = split_domain(len(u), nsub)
+    _, ju, jd = bjs(sigma, scheme)
+    if min(np.diff(bounds)) < depth * max(ju, jd):
+        raise ValueError('Subdomains smaller than the halos of the neighbours')
+    ctx = mp.get_context()
+    shm = shared_memory.SharedMemory(create=True, size=u.nbytes)
+    try:
+        u_sh = np.ndarray(u.shape, dtype=u.dtype, buffer=shm.buf)
+        u_sh[:] = u
+        barrier = ctx.Barrier(nsub)
+        timings = ctx.Array('d', 2, lock=False)
+        res_dtype = np.float64 if mixed else u.dtype
+        warm_dd(u.dtype, res_dtype, sigma, scheme)
+        procs = [ctx.Process(target=_worker, args=(shm.name, len(u), u.dtype, res_dtype,
+                    bounds[k], bounds[k + 1], nt, sigma, scheme, depth, barrier, timings))
+                    for k in range(nsub)]
+        for proc in procs:
+            proc.start()
+        # A dead worker would leave the others waiting at the barrier forever
+        while any(proc.is_alive() for proc in procs):
+            if any(proc.exitcode not in (None, 0) for proc in procs):
+                barrier.abort()
+            time.sleep(1e-3)
+        for proc in procs:
+            proc.join()
+        if any(proc.exitcode != 0 for proc in procs):
+            raise RuntimeError('Domain decomposition worker failed')
+        u[:] = u_sh
+        del u_sh
+    finally:
+        shm.close()
+        shm.unlink()
+    return timings[1] - timings[0]
+
+def time_serial(nt, u, sigma, scheme):
+    """ Wall time of the serial kernel """
+    res = np.zeros_like(u)
+    start = time.perf_counter()
+    its_fd(nt, res, u, sigma, scheme)
+    return time.perf_counter() - start
+
+def time_dd(nt, u, sigma, scheme, nsub, depth):
+    """ Wall time of the stepping phase of the domain decomposed kernel """
+    return its_fd_dd(nt, u, sigma, scheme, nsub, depth)
+
+def scaling(nx, nt, sigma, scheme, nsubs, depth, weak=False):
+    """ Print strong (fixed nx) or weak (fixed nx per subdomain) scaling of
+    the domain decomposed kernel against the serial one """
+    print(f"\n{'Weak' if weak else 'Strong'} scaling - {scheme} - CFL = {sigma:.2f} "
+            f"- nt = {nt:d} - halo depth = {depth:d}")
+    print(f"{'nsub':>6s} {'nx':>12s} {'serial [s]':>12s} {'dd [s]':>12s} "
+            f"{'speedup':>9s} {'eff.':>6s} {'identical':>10s}")
+    # Warm-up of the JIT so that compilation is not measured (the workers
+    # of the domain decomposition warm their kernels before stepping)
+    its_fd(1, np.zeros(16), np.ones(16), sigma, scheme)
+    for nsub in nsubs:
+        n = nx * nsub if weak else nx
+        u0 = np.random.default_rng(0).random(n)
+        u_serial, u_dd = u0.copy(), u0.copy()
+        t_serial = time_serial(nt, u_serial, sigma, scheme)
+        t_dd = time_dd(nt, u_dd, sigma, scheme, nsub, depth)
+        speedup = t_serial / t_dd
+        print(f'{nsub:6d} {n:12d} {t_serial:12.3e} {t_dd:12.3e} {speedup:9.2f} '
+                f'{speedup / nsub:6.2f} {str(np.array_equal(u_serial, u_dd)):>10s}')
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-s', '--scheme', help='Name of the scheme', default='LW')
+    parser.add_argument('--cfl', type=float, default=0.5)
+    parser.add_argument('--nx', type=int, default=10**6,
+        help='Number of points (per subdomain for weak scaling)')
+    parser.add_argument('--nt', type=int, default=200)
+    parser.add_argument('--nsubs', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--depth', type=int, default=1,
+        help='Number of iterations between halo exchanges')
+    args = parser.parse_args()
+    scaling(args.nx, args.nt, args.cfl, args.scheme, args.nsubs, args.depth)
+    scaling(args.nx // max(args.nsubs), args.nt, args.cfl, args.scheme,
+        args.nsubs, args.depth, weak=True)
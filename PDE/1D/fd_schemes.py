@@ -1,5 +1,9 @@
 import numpy as np
 from numba import njit
+from test_funcs import profile_value
+
+# Schemes implemented in bjs, all linear with constant coefficients
+SCHEMES = ('FOU', 'C1', 'LW', 'SOU', 'FR', 'TOS', 'C2')
 
 @njit(cache=True)
 def bjs(sigma, scheme):
@@ -37,24 +41,95 @@ def bjs(sigma, scheme):
 
     return coeffs, ju, jd
 
+@njit(cache=True)
+def cast_coeffs(coeffs, res):
+    """ Coefficients of the scheme in the precision of res """
+    c = np.empty(len(coeffs), dtype=res.dtype)
+    for j in range(len(coeffs)):
+        c[j] = coeffs[j]
+    return c
+
 @njit(cache=True)
 def advance_fd(res, u, sigma, scheme, coeffs, ju, jd):
     """ Calculate the scheme advancement for a scheme with ju upwind points
-    and jd downwind points with periodic boundary conditions """
-    res[:] = 0.0
+    and jd downwind points with periodic boundary conditions. The stencil sum
+    is accumulated in the precision of coeffs. """
     for i in range(len(u)):
+        acc = coeffs[0] - coeffs[0]
         for j in range(-ju, jd + 1):
             if i + j < 0 or i + j > len(u) - 1:
                 index = (i + j) % len(u)
             else:
                 index = i + j
-            res[i] -= coeffs[ju + j] * u[index]
-        res[i] += u[i]
+            acc -= coeffs[ju + j] * u[index]
+        res[i] = acc + u[i]
 
 @njit(cache=True)
 def its_fd(nt, res, u, sigma, scheme):
-    """ Function to do iterations in finite difference formulation """
+    """ Function to do iterations in finite difference formulation, the
+    precision of res sets the one of the stencil sum (float64 res with
+    float32 u for mixed precision) """
     coeffs, ju, jd = bjs(sigma, scheme)
+    coeffs = cast_coeffs(coeffs, res)
     for _ in range(nt):
         advance_fd(res, u, sigma, scheme, coeffs, ju, jd)
-        u -= res
\ No newline at end of file
+        u -= res
+
+# Columns of the diagnostics history filled by its_fd_diag
+DIAGS = ('step', 'L1', 'L2', 'Linf', 'TV', 'min', 'max', 'mass')
+
+@njit(cache=True)
+def update_diag(res, u, x, shift, profile, x0, param, ncx, diags):
+    """ Apply the residual to u and accumulate in the same sweep the errors
+    against the exact profile (PROFILES[profile] moved by shift points in the
+    periodic domain), total variation, extrema and mass of the updated field """
+    n = len(u)
+    dx = x[1] - x[0]
+    l1, l2, linf, tv, mass = 0.0, 0.0, 0.0, 0.0, 0.0
+    umin, umax = np.inf, -np.inf
+    for i in range(n):
+        u[i] -= res[i]
+        # Translation in index space so that integer shifts land exactly on
+        # the grid points
+        j = (i - shift) % n
+        if j >= n:
+            j -= n
+        k = int(j)
+        u_ex = profile_value(profile, x[k] + (j - k) * dx, x0, param)
+        err = abs(u_ex - u[i])
+        l1 += err
+        l2 += err**2
+        linf = max(linf, err)
+        if i > 0:
+            tv += abs(u[i] - u[i - 1])
+        umin = min(umin, u[i])
+        umax = max(umax, u[i])
+        mass += u[i]
+    tv += abs(u[0] - u[n - 1])
+    diags[1] = l1 / ncx
+    diags[2] = np.sqrt(l2) / ncx
+    diags[3] = linf
+    diags[4] = tv
+    diags[5] = umin
+    diags[6] = umax
+    diags[7] = mass * dx
+
+@njit(cache=True)
+def its_fd_diag(nt, res, u, sigma, scheme, ndiag, hist, x, ncx, profile, x0, param):
+    """ Iterations of its_fd recording every ndiag iterations in hist
+    (nt // ndiag + 1 rows, DIAGS columns) the diagnostics of the solution
+    against the initial profile PROFILES[profile] of center x0 and parameter
+    param exactly translated by sigma points per iteration. Errors are
+    normalized as in errors.py and precisions are handled as in its_fd. """
+    coeffs, ju, jd = bjs(sigma, scheme)
+    coeffs = cast_coeffs(coeffs, res)
+    res[:] = 0.0
+    update_diag(res, u, x, 0.0, profile, x0, param, ncx, hist[0])
+    hist[0, 0] = 0
+    for it in range(1, nt + 1):
+        advance_fd(res, u, sigma, scheme, coeffs, ju, jd)
+        if it % ndiag == 0:
+            update_diag(res, u, x, it * sigma, profile, x0, param, ncx, hist[it // ndiag])
+            hist[it // ndiag, 0] = it
+        else:
+            u -= res
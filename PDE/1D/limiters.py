@@ -1,6 +1,4 @@
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
 
 def van_leer(r):
     return (r + np.abs(r)) / (1 + r)
@@ -35,6 +33,9 @@ def ax_prop(ax, title):
     ax.set_ylim([0, 2.5])
 
 if __name__ == '__main__':
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
     fig_dir = 'figures/'
     r = np.linspace(0, 3, 301)
     sns.set_theme()
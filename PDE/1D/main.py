@@ -1,13 +1,27 @@
-import os
 import numpy as np
 import argparse
-from numba import njit
 
-from plot import plot_sim, plot_G, plot_cvg
-from test_funcs import gaussian, step, packet_wave
+from render import Renderer
+from test_funcs import gaussian, step, packet_wave, PROFILES
 from utils import create_dir
-from fd_schemes import its_fd
+from fd_schemes import its_fd, its_fd_diag, DIAGS, SCHEMES
 from errors import L1error, L2error, Linferror
+from precision import PRECISIONS, its_fd_precision, precision_loss
+from sp_analysis import fast_forward
+
+def report_diag(scheme, name, hist, dtype=np.float64):
+    """ Print the final errors and the TVD violations of a diagnostics history,
+    TV increases within the rounding of the field dtype being ignored """
+    d = {diag: hist[:, i] for i, diag in enumerate(DIAGS)}
+    n_tv = np.sum(np.diff(d['TV']) > 1e3 * np.finfo(dtype).eps * d['TV'][0])
+    overshoot = max(d['max'].max() - d['max'][0], d['min'][0] - d['min'].min())
+    print(f"    {scheme:>4s} {name:>10s} - L1 = {d['L1'][-1]:.2e} - Linf = {d['Linf'][-1]:.2e} "
+          f"- TV increases = {n_tv:d}/{len(hist) - 1:d} - max overshoot = {overshoot:.2e}")
+
+def report_loss(precision, loss):
+    """ Print the accuracy lost by a reduced precision run against float64 """
+    print(f"    {'':>4s} {'':>10s}   {precision} loss against double - L1 = {loss['L1']:.2e} "
+          f"- L2 = {loss['L2']:.2e} - Linf = {loss['Linf']:.2e}")
 
 def main(args):
     # figures directory
@@ -20,10 +34,22 @@ def main(args):
     create_dir(sim_dir)
     create_dir(sp_dir)
 
+    # Figures rendered in the background (or only data written)
+    renderer = Renderer(plot=not args.no_plot, nworkers=args.workers)
+
     # Schemes selected
     schemes = args.schemes
     print(f"Schemes selected: {' '.join(schemes)}")
 
+    # Precision of the fields and of the stencil sum
+    u_dtype, res_dtype = PRECISIONS[args.precision]
+    print(f'Precision: {args.precision}')
+
+    # Linear schemes jump directly to the last iteration in Fourier space
+    # for the convergence study (double precision only)
+    fft_schemes = [scheme for scheme in schemes if scheme in SCHEMES
+                    and not args.no_fft and args.precision == 'double']
+
     # Number of periods
     n_periods = 2.0
 
@@ -53,32 +79,48 @@ def main(args):
         
         # initialization (number of timesteps required to do a full round)
         x = np.linspace(xmin, xmax, nnx)
-        u_gauss = np.tile(gaussian(x, x0, 0.3), n_schemes).reshape(n_schemes,  nnx)
-        u_step = np.tile(step(x, x0), n_schemes).reshape(n_schemes,  nnx)
-        u_2pw = np.tile(packet_wave(x, x0, 0.5), n_schemes).reshape(n_schemes,  nnx)
-        u_4pw = np.tile(packet_wave(x, x0, 0.25), n_schemes).reshape(n_schemes,  nnx)
-        res = np.zeros_like(x)
+        u_init = {'gaussian': gaussian(x, x0, 0.3), 'step': step(x, x0),
+                '2pw': packet_wave(x, x0, 0.5), '4pw': packet_wave(x, x0, 0.25)}
+        u_gauss = np.tile(u_init['gaussian'], n_schemes).reshape(n_schemes,  nnx).astype(u_dtype)
+        u_step = np.tile(u_init['step'], n_schemes).reshape(n_schemes,  nnx).astype(u_dtype)
+        u_2pw = np.tile(u_init['2pw'], n_schemes).reshape(n_schemes,  nnx).astype(u_dtype)
+        u_4pw = np.tile(u_init['4pw'], n_schemes).reshape(n_schemes,  nnx).astype(u_dtype)
+        res = np.zeros(nnx, dtype=res_dtype)
         nt = int(n_periods * Lx / a / dt)
 
         print(f'CFL = {cfl:.2f} - nt = {nt:d}')
 
-        # Iteration of the schemes
+        # Iteration of the schemes with in-situ diagnostics, with the accuracy
+        # lost against a float64 run in single or mixed precision
+        sims = {'gaussian': (u_gauss, 'gaussian', 0.3), 'step': (u_step, 'step', 0.0),
+                '2pw': (u_2pw, 'packet_wave', 0.5), '4pw': (u_4pw, 'packet_wave', 0.25)}
+        hists = np.zeros((n_schemes, len(sims), nt // args.ndiag + 1, len(DIAGS)))
         for i_scheme, scheme in enumerate(schemes):
-            its_fd(nt, res, u_gauss[i_scheme, :], cfl, scheme)
-            its_fd(nt, res, u_step[i_scheme, :], cfl, scheme)
-            its_fd(nt, res, u_2pw[i_scheme, :], cfl, scheme)
-            its_fd(nt, res, u_4pw[i_scheme, :], cfl, scheme)
-
-        # One plot per cfl
-        plot_sim(x_th, x, x0, u_gauss, u_step, u_2pw, u_4pw, 
-                schemes, f'CFL = {cfl:.2f} - dx = {dx:.2e} m - dt = {dt:.2e} s - nits = {nt:d}', 
-                sim_dir + f'sim_cfl_{index}')
+            for i_sim, (name, (u_sims, profile, param)) in enumerate(sims.items()):
+                u_sim = u_sims[i_scheme, :]
+                hist = hists[i_scheme, i_sim]
+                if args.precision != 'double':
+                    u_ref = u_init[name].copy()
+                its_fd_diag(nt, res, u_sim, cfl, scheme, args.ndiag, hist, x, ncx, PROFILES.index(profile), x0, param)
+                report_diag(scheme, name, hist, u_dtype)
+                if args.precision != 'double':
+                    its_fd(nt, np.zeros(nnx), u_ref, cfl, scheme)
+                    report_loss(args.precision, precision_loss(u_ref, u_sim, ncx))
+
+        # One plot of the simulations and one of the diagnostics histories per cfl
+        renderer.submit('diag', sim_dir + f'diag_cfl_{index}', hists=hists, diags=DIAGS,
+                names=list(sims), schemes=schemes, figtitle=f'CFL = {cfl:.2f} - dx = {dx:.2e} m',
+                figname=sim_dir + f'diag_cfl_{index}')
+        renderer.submit('sim', sim_dir + f'sim_cfl_{index}', x_th=x_th, x=x, x0=x0,
+                u_gauss=u_gauss, u_step=u_step, u_2pw=u_2pw, u_4pw=u_4pw, schemes=schemes,
+                figtitle=f'CFL = {cfl:.2f} - dx = {dx:.2e} m - dt = {dt:.2e} s - nits = {nt:d}',
+                figname=sim_dir + f'sim_cfl_{index}')
 
     # Plot the diffusion and disperson errors 
     # from the amplification factors of the schemes
     print(f'\n--> Plotting amplifications factors...')
     for scheme in schemes:
-        plot_G(scheme, cfls, sp_dir)
+        renderer.submit('G', sp_dir + f'errors_{scheme}', scheme=scheme, cfls=cfls, fig_dir=sp_dir)
 
     print('\n-------------------------------------------------------')
     print(f'Studying mesh convergence')
@@ -99,24 +141,47 @@ def main(args):
             # number of periods required)
             nt = int(n_periods_cvg * Lx / a / dt)
             x = np.linspace(xmin, xmax, nnx)
-            res = np.zeros_like(x)
+            loss = 0.0
 
             print(f'CFL = {cfl:.2f} - nt = {nt:d}')
             
             for i_func, function in enumerate(functions):
                 u_th = eval(function)
-                u_sim = np.tile(u_th, n_schemes).reshape(n_schemes,  nnx)
 
                 # Iteration of the schemes
                 for i_scheme, scheme in enumerate(schemes):
-                    its_fd(nt, res, u_sim[i_scheme, :], cfl, scheme)
-                    errors[i_mesh, i_scheme, i_func] = L1error(u_th, u_sim[i_scheme, :], ncx)
+                    if scheme in fft_schemes:
+                        errors[i_mesh, i_scheme, i_func] = L1error(u_th, fast_forward(nt, u_th, cfl, scheme), ncx)
+                        continue
+                    u_sim, report = its_fd_precision(nt, u_th, cfl, scheme, args.precision, ncx,
+                                        report=args.precision != 'double')
+                    errors[i_mesh, i_scheme, i_func] = L1error(u_th, u_sim, ncx)
+                    if report is not None:
+                        loss = max(loss, report['L1'])
+
+            if args.precision != 'double':
+                print(f'    Max L1 loss of {args.precision} precision against double: {loss:.2e}')
         # One plot per cfl
-        plot_cvg(nnxs, schemes, functions, errors, f'CFL = {cfl:.2f}', cvg_dir + f'cfl_{index}')
+        renderer.submit('cvg', cvg_dir + f'cfl_{index}', nnxs=nnxs, schemes=schemes,
+                functions=functions, errors=errors, figtitle=f'CFL = {cfl:.2f}',
+                figname=cvg_dir + f'cfl_{index}')
+
+    renderer.close()
 
 if __name__ == '__main__':
     parser = argparse.ArgumentParser()
     parser.add_argument('-s', '--schemes', help='Name of the schemes to study', nargs='+')
     parser.add_argument('-d', '--figdir', help='Name of the figures directory')
+    parser.add_argument('--ndiag', type=int, default=10,
+        help='Number of iterations between two in-situ diagnostics')
+    parser.add_argument('-p', '--precision', choices=list(PRECISIONS), default='double',
+        help='Precision of the fields (mixed: float32 fields with float64 stencil sums), '
+            'the accuracy lost against float64 being reported for every run')
+    parser.add_argument('--no-fft', action='store_true',
+        help='Time-step the convergence study instead of fast-forwarding linear schemes with FFTs')
+    parser.add_argument('--no-plot', action='store_true',
+        help='Only write the result bundles, figures can be rendered later with render.py')
+    parser.add_argument('-w', '--workers', type=int, default=None,
+        help='Number of figure rendering processes')
     args = parser.parse_args()
     main(args)
\ No newline at end of file
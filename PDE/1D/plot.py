@@ -36,6 +36,27 @@ def plot_sim(x_th, x, x0, u_gauss, u_step, u_2pw, u_4pw, schemes, figtitle, fign
     fig.savefig(figname, bbox_inches='tight')
     plt.close(fig)
 
+def plot_diag(hists, diags, names, schemes, figtitle, figname):
+    """ Plot the histories of the L1 error and total variation of the in-situ
+    diagnostics, one column per initial profile """
+    diags = list(diags)
+    fig, axes = plt.subplots(nrows=2, ncols=len(names), sharex=True, figsize=(4 * len(names), 8))
+    for i_name, name in enumerate(names):
+        for i_scheme, scheme in enumerate(schemes):
+            hist = hists[i_scheme, i_name]
+            axes[0, i_name].plot(hist[:, diags.index('step')], hist[:, diags.index('L1')], label=scheme)
+            axes[1, i_name].plot(hist[:, diags.index('step')], hist[:, diags.index('TV')], label=scheme)
+        axes[0, i_name].set_title(name)
+        axes[0, i_name].set_yscale('log')
+        axes[1, i_name].set_xlabel('Iteration')
+    axes[0, 0].set_ylabel('L1 error')
+    axes[1, 0].set_ylabel('TV')
+    axes[0, 0].legend()
+    fig.suptitle(figtitle)
+    fig.tight_layout(rect=[0, 0.03, 1, 0.97])
+    fig.savefig(figname, bbox_inches='tight')
+    plt.close(fig)
+
 def ax_prop_sim(ax):
     ax.legend()
     ax.grid(True)
@@ -54,6 +75,7 @@ def plot_G(scheme, cfls, fig_dir):
     ax_prop_G(axes[1], r'$\varepsilon_\phi$')
     fig.suptitle(f'{scheme} Spectral Analysis')
     fig.savefig(fig_dir + f'errors_{scheme}', bbox_inches='tight')
+    plt.close(fig)
 
 def ax_prop_G(ax, ylabel, ylim=None):
     """ Ax properties of plot_G """
@@ -75,7 +97,7 @@ def plot_cvg(nnxs, schemes, functions, errors, figtitle, figname):
         ax_prop_cvg(axes[i_func])
     fig.suptitle(figtitle)
     fig.savefig(figname, bbox_inches='tight')
-    plt.close()
+    plt.close(fig)
 
 def ax_prop_cvg(ax):
     """ Ax properties of plot_cvg """
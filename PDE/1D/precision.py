@@ -0,0 +1,36 @@
+import numpy as np
+
+from fd_schemes import its_fd
+from errors import L1error, L2error, Linferror
+
+# Data types of the fields and of the stencil sum for each precision
+PRECISIONS = {
+    'double': (np.float64, np.float64),
+    'single': (np.float32, np.float32),
+    'mixed': (np.float32, np.float64),
+}
+
+def precision_arrays(u, precision):
+    """ Copy of u and work array in the given precision """
+    u_dtype, res_dtype = PRECISIONS[precision]
+    return u.astype(u_dtype), np.zeros(len(u), dtype=res_dtype)
+
+def precision_loss(u_ref, u, ncx):
+    """ L1, L2 and Linf differences of u with the float64 result u_ref """
+    u = u.astype(np.float64)
+    return {'L1': L1error(u_ref, u, ncx), 'L2': L2error(u_ref, u, ncx),
+            'Linf': Linferror(u_ref, u, ncx)}
+
+def its_fd_precision(nt, u, sigma, scheme, precision, ncx, report=True):
+    """ Iterations of its_fd on a copy of u in the given precision. Also
+    return, if report, the accuracy lost with respect to the float64 result. """
+    u_p, res = precision_arrays(u, precision)
+    its_fd(nt, res, u_p, sigma, scheme)
+    if not report:
+        return u_p, None
+    u_ref, res = precision_arrays(u, 'double')
+    if precision == 'double':
+        u_ref = u_p
+    else:
+        its_fd(nt, res, u_ref, sigma, scheme)
+    return u_p, precision_loss(u_ref, u_p, ncx)
@@ -0,0 +1,61 @@
+import argparse
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+
+def load_bundle(filename):
+    """ Load a result bundle as the kind of figure and the arguments
+    of the corresponding plotting function """
+    with np.load(filename) as bundle:
+        data = {key: bundle[key].item() if bundle[key].ndim == 0 else bundle[key]
+                    for key in bundle.files}
+    return data.pop('kind'), data
+
+def render_bundle(filename):
+    """ Render the figure of a result bundle with the Agg backend """
+    import matplotlib
+    matplotlib.use('Agg')
+    import plot
+    kind, data = load_bundle(filename)
+    getattr(plot, f'plot_{kind}')(**data)
+    return filename
+
+class Renderer:
+    """ Dump result bundles (npz) of the plotting functions of plot.py and
+    render them in a background process pool, or only write the data
+    when plot is False """
+    def __init__(self, plot=True, nworkers=None):
+        self.plot = plot
+        self.pool = ProcessPoolExecutor(nworkers) if plot else None
+        self.futures = []
+
+    def submit(self, kind, filename, **data):
+        """ Write the bundle filename.npz of plot_{kind}(**data) and queue its rendering """
+        np.savez(f'{filename}.npz', kind=kind, **data)
+        if self.plot:
+            self.futures.append(self.pool.submit(render_bundle, f'{filename}.npz'))
+
+    def close(self):
+        """ Wait for the pending figures, raising the first rendering error """
+        if self.pool is not None:
+            try:
+                for future in self.futures:
+                    future.result()
+            finally:
+                self.pool.shutdown()
+                self.futures = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Render figures from result bundles')
+    parser.add_argument('bundles', help='npz result bundles', nargs='+')
+    parser.add_argument('-w', '--workers', type=int, default=None,
+        help='Number of rendering processes')
+    args = parser.parse_args()
+    with ProcessPoolExecutor(args.workers) as pool:
+        for filename in pool.map(render_bundle, args.bundles):
+            print(f'Rendered {filename}')
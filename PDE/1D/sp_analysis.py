@@ -1,9 +1,7 @@
 #!/Users/cheng/code/envs/dl/bin/python
-import os
 import numpy as np
 import cmath
-import matplotlib.pyplot as plt
-from fd_schemes import bjs
+from fd_schemes import bjs, SCHEMES
 
 def ampl_factor(phi, sigma, scheme):
     """ Return the amplification factor for a scheme with ju upwind points
@@ -22,3 +20,37 @@ def errors(G_num, phi, sigma):
     disp_err[0] = 1
     disp_err[1:] = np.array([- cmath.phase(G_num[i]) / sigma / phi[i] for i in range(1, len(phi))])
     return diff_err, disp_err
+
+def fast_forward(nt, u, sigma, scheme):
+    """ Solution after nt iterations of a linear scheme on the periodic
+    array u, each Fourier mode being multiplied by G(phi)^nt. nt can also
+    be a list of iterations, one solution per row being returned then """
+    if scheme not in SCHEMES:
+        raise ValueError(f'Scheme {scheme} cannot be fast-forwarded')
+    n = len(u)
+    phi = 2 * np.pi * np.arange(n // 2 + 1) / n
+    G = ampl_factor(phi, sigma, scheme)
+    u_hat = np.fft.rfft(u)
+    u_nt = np.fft.irfft(u_hat * G**np.atleast_1d(nt)[:, np.newaxis], n=n)
+    return u_nt[0] if np.ndim(nt) == 0 else u_nt
+
+if __name__ == '__main__':
+    import time
+    from fd_schemes import its_fd
+    from test_funcs import step
+
+    # Accuracy and cost of fast-forwarding against the time-stepping kernel
+    x = np.linspace(-1, 1, 4001)
+    sigma, nts = 0.7, [100, 1000, 10000]
+    print(f"{'scheme':>6s} {'nt':>6s} {'Linf diff':>10s} {'its_fd [s]':>11s} {'fft [s]':>9s}")
+    for scheme in SCHEMES:
+        its_fd(1, np.zeros_like(x), step(x, 0.0), sigma, scheme)
+        for nt in nts:
+            u = step(x, 0.0)
+            start = time.perf_counter()
+            its_fd(nt, np.zeros_like(u), u, sigma, scheme)
+            t_fd = time.perf_counter() - start
+            start = time.perf_counter()
+            u_ff = fast_forward(nt, step(x, 0.0), sigma, scheme)
+            t_ff = time.perf_counter() - start
+            print(f'{scheme:>6s} {nt:6d} {np.max(np.abs(u - u_ff)):10.2e} {t_fd:11.2e} {t_ff:9.2e}')
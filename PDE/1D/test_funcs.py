@@ -1,4 +1,5 @@
 import numpy as np
+from numba import njit
 
 def gaussian(x, x0, sigma_x):
     """ Gaussian test function """
@@ -11,3 +12,18 @@ def step(x, x0):
 def packet_wave(x, x0, lam):
     """ Packet wave of spatial period lam """
     return np.where(abs(x - x0) < 0.5, np.sin(2 * np.pi / lam * (x - x0)), 0)
+
+# Test functions evaluated inside the kernels, by index in PROFILES
+PROFILES = ('gaussian', 'step', 'packet_wave')
+
+@njit(cache=True)
+def profile_value(profile, x, x0, param):
+    """ Scalar value at x of the test function PROFILES[profile], param being
+    sigma_x for gaussian and lam for packet_wave (unused for step) """
+    if profile == 0:
+        return np.exp(- (x - x0)**2 / 2 / param**2)
+    if abs(x - x0) >= 0.5:
+        return 0.0
+    if profile == 1:
+        return 1.0
+    return np.sin(2 * np.pi / param * (x - x0))
@@ -0,0 +1,31 @@
+import argparse
+import numpy as np
+
+from fd_schemes import its_fd, its_fd_diag, DIAGS, SCHEMES
+from dd_schemes import gather_halo, its_fd_local
+from test_funcs import PROFILES
+from precision import PRECISIONS
+
+# Kernels called by warmup, whose cache statistics bench.py checks
+KERNELS = (its_fd, its_fd_local, gather_halo, its_fd_diag)
+
+def warmup(precisions=tuple(PRECISIONS)):
+    """ Compile (or load from the Numba cache) every kernel for all the
+    supported signatures by running them once on a tiny periodic grid """
+    for precision in precisions:
+        u_dtype, res_dtype = PRECISIONS[precision]
+        x = np.linspace(-1, 1, 16)
+        u = np.ones_like(x, dtype=u_dtype)
+        res = np.zeros_like(x, dtype=res_dtype)
+        hist = np.zeros((2, len(DIAGS)))
+        coeffs = np.zeros(3, dtype=res_dtype)
+        its_fd(1, res, u, 0.5, SCHEMES[0])
+        its_fd_local(1, res, u, 0.5, SCHEMES[0], coeffs, 1, 1)
+        gather_halo(u, u.copy(), 0, 1)
+        its_fd_diag(1, res, u, 0.5, SCHEMES[0], 1, hist, x, 15, PROFILES.index('gaussian'), 0.0, 0.3)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Fill the Numba cache of the FD kernels')
+    parser.add_argument('-p', '--precisions', nargs='+', default=list(PRECISIONS), choices=list(PRECISIONS))
+    args = parser.parse_args()
+    warmup(args.precisions)